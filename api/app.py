@@ -6,6 +6,7 @@ This is the main entry point for the review system API.
 Run with: uvicorn api.app:app --reload
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,6 +15,15 @@ from pathlib import Path
 import os
 
 from .routes import review_router, manager_router
+from .services.validation import get_validator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up: load and compile all schemas before serving requests"""
+    get_validator().preload_all()
+    yield
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -37,7 +47,8 @@ app = FastAPI(
     """,
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -20,6 +20,11 @@ import secrets
 from pathlib import Path
 
 
+def _now() -> datetime:
+    """Current UTC time (module-level so tests can substitute the clock)"""
+    return datetime.utcnow()
+
+
 class ReviewStatus(str, Enum):
     """
     Review status state machine
@@ -75,7 +80,7 @@ class DownloadToken:
     @classmethod
     def generate(cls, review_id: str, ttl_seconds: int = 300) -> "DownloadToken":
         """Generate a new download token with specified TTL (default 5 minutes)"""
-        now = datetime.utcnow()
+        now = _now()
         token = secrets.token_urlsafe(32)
         return cls(
             token=token,
@@ -87,12 +92,12 @@ class DownloadToken:
 
     def is_valid(self) -> bool:
         """Check if token is valid (not expired and not used)"""
-        return not self.used and datetime.utcnow() < self.expires_at
+        return not self.used and _now() < self.expires_at
 
     def mark_used(self) -> None:
         """Mark token as used"""
         self.used = True
-        self.used_at = datetime.utcnow()
+        self.used_at = _now()
 
     def to_dict(self) -> dict:
         return {
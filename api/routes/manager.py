@@ -11,23 +11,25 @@ SECURITY REQUIREMENTS:
 """
 
 from fastapi import APIRouter, HTTPException, Request, Response
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 import os
 
 from ..models.review import Review, ReviewStatus
 from ..services.storage import ReviewStorage
-from ..services.render_html import HtmlRenderer
+from ..services.render_html import get_html_renderer
 from ..services.render_docx import DocxRenderService
-from ..services.supervisor_auth import get_supervisor_auth_service, Supervisor
+from ..services.supervisor_auth import (
+    get_supervisor_auth_service, normalize_approval_code, Supervisor
+)
 
 
 router = APIRouter(prefix="/manager", tags=["manager"])
 
 # Initialize services
 storage = ReviewStorage()
-html_renderer = HtmlRenderer()
+html_renderer = get_html_renderer()
 docx_service = DocxRenderService()
 supervisor_auth = get_supervisor_auth_service()
 
@@ -195,7 +197,8 @@ async def authorize_with_code(req: AuthorizeRequest, request: Request):
     3. Returns short-lived, single-use download token
     """
     # Validate approval code
-    is_valid, approval_code, error_msg = supervisor_auth.validate_approval_code(req.approval_code)
+    code = normalize_approval_code(req.approval_code)
+    is_valid, approval_code, error_msg = supervisor_auth.validate_approval_code(code)
     if not is_valid:
         return AuthorizeResponse(success=False, error=error_msg)
 
@@ -232,7 +235,7 @@ async def authorize_with_code(req: AuthorizeRequest, request: Request):
         )
 
     # Mark approval code as used
-    supervisor_auth.use_approval_code(req.approval_code)
+    supervisor_auth.use_approval_code(code)
 
     # Generate download token
     token = storage.create_download_token(approval_code.review_id, TOKEN_TTL_SECONDS)
@@ -297,8 +300,8 @@ async def manager_preview(review_id: str, token: str, request: Request):
     base_url = str(request.base_url).rstrip("/")
     download_url = f"{base_url}/manager/reviews/{review_id}/download?token={token}"
 
-    # Render document preview using template.html
-    html = html_renderer.render_document_preview(
+    # Render document preview using template.html (streamed)
+    html_chunks = html_renderer.render_document_preview_stream(
         doc_type=review.doc_type,
         data_json=review.data_json,
         review_id=review_id,
@@ -310,7 +313,7 @@ async def manager_preview(review_id: str, token: str, request: Request):
         token=token
     )
 
-    return HTMLResponse(content=html)
+    return StreamingResponse(html_chunks, media_type="text/html")
 
 
 @router.get("/reviews/{review_id}/download")
@@ -423,7 +426,7 @@ async def get_code_info(code: str):
     Get information about an approval code
     Obtener informacion sobre un codigo de aprobacion
     """
-    info = supervisor_auth.get_approval_code_info(code)
+    info = supervisor_auth.get_approval_code_info(normalize_approval_code(code))
     if not info:
         raise HTTPException(status_code=404, detail="Approval code not found")
 
@@ -10,24 +10,26 @@ SECURITY REQUIREMENTS:
 """
 
 from fastapi import APIRouter, HTTPException, Request, Response
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import os
 
+import orjson
+
 from ..models.review import Review, ReviewStatus
 from ..services.storage import ReviewStorage
-from ..services.validation import SchemaValidator
-from ..services.render_html import HtmlRenderer
+from ..services.validation import get_validator
+from ..services.render_html import get_html_renderer
 
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
 # Initialize services
 storage = ReviewStorage()
-validator = SchemaValidator()
-html_renderer = HtmlRenderer()
+validator = get_validator()
+html_renderer = get_html_renderer()
 
 
 # Request/Response models
@@ -134,8 +136,8 @@ async def get_preview(review_id: str, request: Request):
     # Get editable fields from schema
     editable_fields = validator.get_editable_fields(review.doc_type)
 
-    # Render document preview using template.html
-    html = html_renderer.render_document_preview(
+    # Render document preview using template.html (streamed)
+    html_chunks = html_renderer.render_document_preview_stream(
         doc_type=review.doc_type,
         data_json=review.data_json,
         review_id=review_id,
@@ -145,7 +147,7 @@ async def get_preview(review_id: str, request: Request):
         mode="employee"
     )
 
-    return HTMLResponse(content=html)
+    return StreamingResponse(html_chunks, media_type="text/html")
 
 
 @router.get("/{review_id}/data", response_model=ReviewDataResponse)
@@ -218,11 +220,16 @@ async def update_data(review_id: str, req: UpdateDataRequest, request: Request):
     # Save
     storage.save(review)
 
-    return UpdateDataResponse(
-        success=validation_result.is_valid,
-        updated_fields=updated_fields,
-        rejected_fields=validation_result.unauthorized_fields,
-        errors=[{"field": e.field, "message": e.message} for e in validation_result.errors]
+    # Encode straight to bytes; the body matches UpdateDataResponse (kept as
+    # response_model for the OpenAPI docs) without a pydantic round-trip
+    return Response(
+        content=orjson.dumps({
+            "success": validation_result.is_valid,
+            "updated_fields": updated_fields,
+            "rejected_fields": validation_result.unauthorized_fields,
+            "errors": [{"field": e.field, "message": e.message} for e in validation_result.errors],
+        }),
+        media_type="application/json"
     )
 
 
@@ -274,7 +281,11 @@ async def get_schema(review_id: str):
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
 
-    return validator.get_schema_for_ui(review.doc_type)
+    # Pre-serialized once per doc_type; skips FastAPI's JSON encoding pass
+    return Response(
+        content=validator.get_schema_for_ui_json(review.doc_type),
+        media_type="application/json"
+    )
 
 
 @router.get("/{review_id}/status")
@@ -13,6 +13,7 @@ import re
 from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
+from html.parser import HTMLParser
 import html
 
 
@@ -123,7 +124,8 @@ class BlockParser:
         """Extract just the block keys from template"""
         return [block.key for block in self.parse_template(template_content)]
 
-    def render_block_inner(self, inner_template: str, data: Dict[str, Any]) -> str:
+    def render_block_inner(self, inner_template: str, data: Dict[str, Any],
+                           escape_values: bool = False) -> str:
         """
         Render block inner template with data variables
 
@@ -132,6 +134,7 @@ class BlockParser:
         Args:
             inner_template: Template string with {{ variables }}
             data: Data dictionary with variable values
+            escape_values: HTML-escape substituted values (for HTML output)
 
         Returns:
             Rendered string
@@ -146,6 +149,8 @@ class BlockParser:
             value = data.get(var_name, "")
             if value is None:
                 return ""
+            if escape_values:
+                return html.escape(str(value))
             return str(value)
 
         result = var_pattern.sub(replace_var, result)
@@ -328,6 +333,56 @@ class BlockSchemaLoader:
         }
 
 
+class _TagFilterParser(HTMLParser):
+    """
+    Streaming tag filter behind HtmlSanitizer
+
+    Single left-to-right pass (no regex backtracking on malformed input).
+    Keeps allowed tags without attributes, drops every other tag and the
+    contents of script/style elements. Entities are decoded in text; with
+    escape_text the text is re-escaped so stray angle brackets can't form
+    markup.
+    """
+
+    DROP_CONTENT_TAGS = frozenset({'script', 'style'})
+
+    def __init__(self, allowed_tags: frozenset, escape_text: bool):
+        super().__init__(convert_charrefs=True)
+        self.allowed_tags = allowed_tags
+        self.escape_text = escape_text
+        self.parts: List[str] = []
+        self._drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.DROP_CONTENT_TAGS:
+            self._drop_depth += 1
+        elif tag in self.allowed_tags and not self._drop_depth:
+            # Keep allowed tags but strip attributes (prevent XSS)
+            self.parts.append(f"<{tag}>")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in self.allowed_tags and not self._drop_depth:
+            self.parts.append(f"<{tag}>")
+
+    def handle_endtag(self, tag):
+        if tag in self.DROP_CONTENT_TAGS:
+            if self._drop_depth:
+                self._drop_depth -= 1
+        elif tag in self.allowed_tags and tag != 'br' and not self._drop_depth:
+            self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self._drop_depth:
+            self.parts.append(html.escape(data, quote=False) if self.escape_text else data)
+
+    @classmethod
+    def run(cls, html_content: str, allowed_tags: frozenset, escape_text: bool) -> str:
+        parser = cls(allowed_tags, escape_text)
+        parser.feed(html_content)
+        parser.close()
+        return "".join(parser.parts)
+
+
 class HtmlSanitizer:
     """
     Sanitizes HTML for richtext_limited fields
@@ -335,10 +390,7 @@ class HtmlSanitizer:
     Only allows: b, i, u, br, ul, ol, li, p
     """
 
-    ALLOWED_TAGS = {'b', 'i', 'u', 'br', 'ul', 'ol', 'li', 'p', 'strong', 'em'}
-
-    # Pattern to match HTML tags
-    TAG_PATTERN = re.compile(r'<(/?)(\w+)([^>]*)>', re.IGNORECASE)
+    ALLOWED_TAGS = frozenset({'b', 'i', 'u', 'br', 'ul', 'ol', 'li', 'p', 'strong', 'em'})
 
     @classmethod
     def sanitize(cls, html_content: str) -> str:
@@ -349,47 +401,21 @@ class HtmlSanitizer:
             html_content: Raw HTML content
 
         Returns:
-            Sanitized HTML with only allowed tags
+            Sanitized HTML with only allowed tags (script/style content removed,
+            remaining text HTML-escaped)
         """
         if not html_content:
             return ""
 
-        def replace_tag(match):
-            closing = match.group(1)
-            tag_name = match.group(2).lower()
-            attrs = match.group(3)
-
-            if tag_name in cls.ALLOWED_TAGS:
-                # Keep allowed tags but strip attributes (prevent XSS)
-                if closing:
-                    return f"</{tag_name}>"
-                else:
-                    # br is self-closing
-                    if tag_name == 'br':
-                        return "<br>"
-                    return f"<{tag_name}>"
-            else:
-                # Remove disallowed tags
-                return ""
-
-        sanitized = cls.TAG_PATTERN.sub(replace_tag, html_content)
-
-        # Also escape any remaining angle brackets that aren't part of allowed tags
-        # This prevents injection of script via malformed tags
-
-        return sanitized
+        return _TagFilterParser.run(html_content, cls.ALLOWED_TAGS, escape_text=True)
 
     @classmethod
     def strip_all_tags(cls, html_content: str) -> str:
-        """Remove all HTML tags and return plain text"""
+        """Remove all HTML tags and return plain text (entities decoded)"""
         if not html_content:
             return ""
 
-        # Remove all tags
-        text = re.sub(r'<[^>]+>', '', html_content)
-        # Decode HTML entities
-        text = html.unescape(text)
-        return text.strip()
+        return _TagFilterParser.run(html_content, frozenset(), escape_text=False).strip()
 
     @classmethod
     def convert_to_word_format(cls, html_content: str) -> str:
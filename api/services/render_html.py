@@ -11,9 +11,11 @@ B1 MODE: Supports [[BLOCK:key]]...[[/BLOCK]] anchor blocks with:
 """
 
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from datetime import date, datetime
+from functools import lru_cache
 from jinja2 import Environment, FileSystemLoader, select_autoescape, BaseLoader
+from markupsafe import Markup
 import sys
 import re
 import json
@@ -23,12 +25,34 @@ import html as html_module
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from modules.plugin_loader import load_plugin
-from modules.context_builder import ContextBuilder
+from modules.context_builder import ContextBuilder, SPANISH_MONTHS
 from .block_parser import (
     BlockParser, BlockDefinition, BlockSchemaLoader,
     RenderedBlock, AppendMode, CustomFieldType
 )
 
+# String values rendered as "Si" by the bool_sn filter
+_TRUE_SET = frozenset({'true', 'si', 'yes', '1', 'sí'})
+
+
+@lru_cache(maxsize=512)
+def _fmt_ymd(year: int, month: int, day: int) -> str:
+    """Cached Spanish long date: 31 de diciembre de 2025"""
+    return f"{day} de {SPANISH_MONTHS[month - 1]} de {year}"
+
+
+# Error panel shown in place of the document when template rendering fails
+ERROR_PANEL_JINJA = """
+<div class="error" style="background: #fee2e2; border: 1px solid #fca5a5; padding: 20px; border-radius: 8px; margin: 20px;">
+    <h3 style="color: #991b1b; margin-bottom: 10px;">Error rendering template</h3>
+    <p style="color: #b91c1c;">{{ err }}</p>
+    <details style="margin-top: 10px;">
+        <summary style="cursor: pointer; color: #6b7280;">Ver detalles tecnicos</summary>
+        <pre style="background: #f9fafb; padding: 10px; margin-top: 10px; overflow: auto; font-size: 12px;">{{ detail }}</pre>
+    </details>
+</div>
+"""
+
 
 class HtmlRenderer:
     """
@@ -49,6 +73,9 @@ class HtmlRenderer:
         self.schemas_dir = Path(schemas_dir)
         self.block_parser = BlockParser()
 
+        # Static per-doc_type block data: list of (fields, inner_template)
+        self._block_skeletons: Dict[str, List[Tuple[dict, str]]] = {}
+
         # Setup Jinja2 environment
         self.env = Environment(
             loader=FileSystemLoader(str(self.templates_dir)),
@@ -63,6 +90,9 @@ class HtmlRenderer:
         self.env.filters['bool_sn'] = self._format_bool_sn
         self.env.filters['render_block'] = self._render_block_html
 
+        # Precompiled error panel (autoescaped like any string template)
+        self._error_tpl = self.env.from_string(ERROR_PANEL_JINJA)
+
     def _format_date_spanish(self, value) -> str:
         """Format date in Spanish format"""
         if value is None:
@@ -78,11 +108,7 @@ class HtmlRenderer:
                     return value
 
         if isinstance(value, (date, datetime)):
-            months = [
-                "enero", "febrero", "marzo", "abril", "mayo", "junio",
-                "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
-            ]
-            return f"{value.day} de {months[value.month - 1]} de {value.year}"
+            return _fmt_ymd(value.year, value.month, value.day)
 
         return str(value)
 
@@ -98,12 +124,12 @@ class HtmlRenderer:
 
     def _format_bool_sn(self, value) -> str:
         """Format boolean as Si/No"""
-        if value is None:
+        if value is None or value is False:
             return "No"
-        if isinstance(value, bool):
-            return "Si" if value else "No"
+        if value is True:
+            return "Si"
         if isinstance(value, str):
-            return "Si" if value.lower() in ('true', 'si', 'yes', '1') else "No"
+            return "Si" if value.lower() in _TRUE_SET else "No"
         return "Si" if value else "No"
 
     def _render_block_html(self, block: dict) -> str:
@@ -141,37 +167,44 @@ class HtmlRenderer:
             ...
         ]
         """
-        blocks_config = self.load_blocks_config(doc_type)
-        rendered_blocks = []
+        render_inner = self.block_parser.render_block_inner
 
-        for block_key, config in blocks_config.items():
-            # Create block definition
-            block_def = BlockDefinition.from_schema(block_key, config)
-
-            # Get inner template if defined in config (or empty)
-            inner_template = config.get("inner_template", "")
+        # Only base_html, custom_value and can_edit vary per render.
+        # Base content is rendered with escaped values, so the result is
+        # safe to insert without another escape pass.
+        return [
+            {
+                **static,
+                "base_html": Markup(render_inner(inner_template, data_json, escape_values=True)),
+                "custom_value": data_json.get(static["custom_field"], "") or "",
+                "can_edit": can_edit,
+            }
+            for static, inner_template in self._get_block_skeletons(doc_type)
+        ]
 
-            # Render base content with variables
-            base_html = self.block_parser.render_block_inner(inner_template, data_json)
+    def _get_block_skeletons(self, doc_type: str) -> List[Tuple[dict, str]]:
+        """Build and cache the static part of each block for doc_type"""
+        skeletons = self._block_skeletons.get(doc_type)
+        if skeletons is not None:
+            return skeletons
 
-            # Get custom field value
-            custom_field = config.get("custom_field", f"{block_key}_custom")
-            custom_value = data_json.get(custom_field, "")
+        skeletons = []
+        for block_key, config in self.load_blocks_config(doc_type).items():
+            # Validates append_mode / custom_type once per doc_type
+            block_def = BlockDefinition.from_schema(block_key, config)
 
-            rendered_blocks.append({
+            skeletons.append(({
                 "key": block_key,
-                "base_html": base_html,
-                "custom_field": custom_field,
-                "custom_value": custom_value or "",
+                "custom_field": block_def.custom_field,
                 "custom_type": config.get("custom_type", "text"),
-                "max_length": config.get("max_length", 2000),
+                "max_length": block_def.max_length,
                 "append_mode": config.get("append_mode", "newline"),
-                "label": config.get("label", ""),
-                "can_edit": can_edit,
+                "label": block_def.label,
                 "description": config.get("description", "")
-            })
+            }, config.get("inner_template", "")))
 
-        return rendered_blocks
+        self._block_skeletons[doc_type] = skeletons
+        return skeletons
 
     def render_block_component(self, block: dict) -> str:
         """
@@ -187,6 +220,10 @@ class HtmlRenderer:
         custom_type = block.get("custom_type", "text")
         custom_value = block.get("custom_value", "")
 
+        # Attribute fragments that depend on edit permission
+        contenteditable = "true" if can_edit else "false"
+        readonly_attr = "" if can_edit else "readonly"
+
         # Escape for HTML
         import html
         base_html = block.get("base_html", "")
@@ -198,14 +235,14 @@ class HtmlRenderer:
             input_html = f'''<div class="richtext-editor"
                 data-field="{block['custom_field']}"
                 data-max-length="{block['max_length']}"
-                contenteditable="{str(can_edit).lower()}">{custom_value}</div>'''
+                contenteditable="{contenteditable}">{custom_value}</div>'''
         else:
             input_html = f'''<textarea
                 name="{block['custom_field']}"
                 data-field="{block['custom_field']}"
                 maxlength="{block['max_length']}"
                 placeholder="Agregar comentario adicional..."
-                {'readonly' if not can_edit else ''}>{custom_value_escaped}</textarea>'''
+                {readonly_attr}>{custom_value_escaped}</textarea>'''
 
         return f'''
         <section class="doc-block" data-block="{block['key']}">
@@ -265,9 +302,9 @@ class HtmlRenderer:
             template = self.env.get_template("_base/preview.html")
 
         # Render with full context plus UI-specific variables
-        html = template.render(
-            # Document data (same as Word)
-            **full_context,
+        # (full_context is freshly built, so extend it in place and pass
+        # the mapping directly instead of splatting it into kwargs)
+        full_context.update(
             data=data_json,
             # UI-specific context
             review_id=review_id,
@@ -281,7 +318,7 @@ class HtmlRenderer:
             render_block=self.render_block_component
         )
 
-        return html
+        return template.render(full_context)
 
     def render_manager_page(self, review_id: str, doc_type: str, status: str,
                             client_name: str = "") -> str:
@@ -357,9 +394,28 @@ class HtmlRenderer:
                                  editable_fields: list, mode: str = "employee",
                                  download_url: str = None, token: str = None) -> str:
         """
+        Render document preview as a single HTML string
+        Renderizar previsualizacion del documento como un unico string HTML
+
+        See render_document_preview_stream() for arguments.
+        """
+        return "".join(self.render_document_preview_stream(
+            doc_type, data_json, review_id, status, can_edit,
+            editable_fields, mode, download_url, token
+        ))
+
+    def render_document_preview_stream(self, doc_type: str, data_json: Dict[str, Any],
+                                        review_id: str, status: str, can_edit: bool,
+                                        editable_fields: list, mode: str = "employee",
+                                        download_url: str = None,
+                                        token: str = None) -> Iterator[str]:
+        """
         Render document preview using the template.html from config/templates
         Renderizar previsualizacion del documento usando template.html de config/templates
 
+        The wrapper page is streamed in buffered chunks so responses can start
+        sending before the whole page has been rendered.
+
         Args:
             doc_type: Document type (e.g., "carta_manifestacion")
             data_json: Data to fill the template
@@ -372,7 +428,7 @@ class HtmlRenderer:
             token: Download token (manager mode)
 
         Returns:
-            Rendered HTML string with document preview
+            Iterator of HTML chunks with document preview
         """
         # Load plugin for context building
         plugin = load_plugin(doc_type)
@@ -392,8 +448,8 @@ class HtmlRenderer:
 
         if not template_file.exists():
             # Fallback to default preview if template doesn't exist
-            return self.render_preview(doc_type, data_json, editable_fields,
-                                        review_id, status, can_edit)
+            return iter([self.render_preview(doc_type, data_json, editable_fields,
+                                             review_id, status, can_edit)])
 
         # Create a separate Jinja2 environment for config templates
         config_env = Environment(
@@ -411,7 +467,7 @@ class HtmlRenderer:
         try:
             # Render the document template
             doc_template = config_env.get_template(f"{doc_type}/template.html")
-            document_html = doc_template.render(**full_context)
+            document_html = doc_template.render(full_context)
 
             # Process [[BLOCK:key]]...[[/BLOCK]] markers if any remain
             document_html = self._process_block_markers(document_html, data_json, can_edit)
@@ -419,16 +475,7 @@ class HtmlRenderer:
             # If rendering fails, show error with more details
             import traceback
             error_detail = traceback.format_exc()
-            document_html = f'''
-            <div class="error" style="background: #fee2e2; border: 1px solid #fca5a5; padding: 20px; border-radius: 8px; margin: 20px;">
-                <h3 style="color: #991b1b; margin-bottom: 10px;">Error rendering template</h3>
-                <p style="color: #b91c1c;">{html_module.escape(str(e))}</p>
-                <details style="margin-top: 10px;">
-                    <summary style="cursor: pointer; color: #6b7280;">Ver detalles tecnicos</summary>
-                    <pre style="background: #f9fafb; padding: 10px; margin-top: 10px; overflow: auto; font-size: 12px;">{html_module.escape(error_detail)}</pre>
-                </details>
-            </div>
-            '''
+            document_html = self._error_tpl.render(err=str(e), detail=error_detail)
 
         # Load the wrapper template for the preview
         wrapper_template = self.env.get_template("_base/document_preview.html")
@@ -436,8 +483,9 @@ class HtmlRenderer:
         # B1 MODE: Render blocks for potential use in wrapper
         blocks = self.render_blocks(doc_type, data_json, can_edit)
 
-        return wrapper_template.render(
-            document_html=document_html,
+        stream = wrapper_template.stream(
+            # Already escaped by the autoescaping document template
+            document_html=Markup(document_html),
             review_id=review_id,
             status=status,
             can_edit=can_edit,
@@ -450,3 +498,17 @@ class HtmlRenderer:
             blocks=blocks,
             client_name=data_json.get("Nombre_Cliente", "")
         )
+        stream.enable_buffering(size=8)
+        return stream
+
+
+# Singleton instance
+_html_renderer: Optional[HtmlRenderer] = None
+
+
+def get_html_renderer() -> HtmlRenderer:
+    """Get singleton instance of HtmlRenderer"""
+    global _html_renderer
+    if _html_renderer is None:
+        _html_renderer = HtmlRenderer()
+    return _html_renderer
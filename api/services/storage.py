@@ -3,14 +3,20 @@ Storage Service - File-based storage for reviews with concurrency control
 Servicio de almacenamiento basado en archivos para revisiones con control de concurrencia
 """
 
-import json
+import mmap
+import operator
 import os
+import shutil
 import sys
+import orjson
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from datetime import datetime, timedelta
 import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from dataclasses import dataclass
 
 # Cross-platform file locking
 # Windows uses msvcrt, Unix uses fcntl
@@ -65,6 +71,244 @@ else:
 
 from ..models.review import Review, DownloadToken
 
+# Stored JSON is machine-read, so it is written compact; set
+# DEBUG_PRETTY_JSON=1 to get indented files while debugging
+JSON_DUMP_OPTION = orjson.OPT_INDENT_2 if os.environ.get("DEBUG_PRETTY_JSON") else 0
+
+# STORAGE_PARALLEL_LOAD=1 loads list_reviews results on a thread pool
+# (file reads and orjson parsing release the GIL); helps on SSD/NVMe
+PARALLEL_LOAD = os.environ.get("STORAGE_PARALLEL_LOAD") == "1"
+PARALLEL_LOAD_WORKERS = 8
+
+
+# Files at least this large are parsed from a read-only mmap instead of
+# being copied into a bytes object first; smaller ones take a single read
+MMAP_MIN_BYTES = 64 * 1024
+
+
+def load_json_file(path: Union[str, Path]):
+    """
+    Parse a JSON file with orjson, memory-mapping it when it is large
+    Leer un archivo JSON con orjson, usando mmap si es grande
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size < MMAP_MIN_BYTES:
+            return orjson.loads(os.read(fd, size) if size else b"")
+        with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as buf:
+            with memoryview(buf) as view:
+                return orjson.loads(view)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Union[str, Path], payload: bytes) -> None:
+    """
+    Atomically replace path with payload (write temp file, fsync, rename)
+    Reemplazar path de forma atomica (archivo temporal, fsync, renombrar)
+
+    Readers see either the old or the new file, never a torn one, so no
+    reader lock is needed.
+    """
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+    # Persist the rename itself (directories can't be opened on Windows)
+    if sys.platform != 'win32':
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class JsonJournal:
+    """
+    JSON snapshot plus append-only NDJSON journal for small key/value stores
+    Snapshot JSON mas journal NDJSON de solo anadido para almacenes clave/valor
+
+    Each mutation appends one {"op": "put"|"del", "key": ..., "value": ...}
+    line instead of rewriting the whole snapshot. load() replays the journal
+    on top of the snapshot; compact() rewrites the snapshot and truncates
+    the journal once it grows past compact_ratio times the snapshot size.
+
+    Several processes may share one store (the API and the Streamlit UI both
+    use approval_codes.json): loads, writes and compaction hold an exclusive
+    lock on a sidecar .lock file. Callers doing read-modify-write hold
+    locked() across the whole sequence and compact from freshly loaded data.
+    """
+
+    # Journal bytes always tolerated before compacting a small snapshot
+    MIN_COMPACT_BYTES = 64 * 1024
+
+    def __init__(self, snapshot_path: Path, compact_ratio: int = 4):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix(".ndjson")
+        self.lock_path = self.snapshot_path.with_suffix(".lock")
+        self.compact_ratio = compact_ratio
+        # Threads share the instance; the file lock is taken once per outer locked()
+        self._mutex = threading.RLock()
+        self._lock_depth = 0
+        self._journal = None
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+
+    @contextmanager
+    def locked(self):
+        """
+        Exclusive cross-process lock on the store (reentrant within a thread)
+        Bloqueo exclusivo entre procesos sobre el almacen
+        """
+        with self._mutex:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, 'a+b') as f:
+                with file_lock_exclusive(f):
+                    self._lock_depth = 1
+                    try:
+                        yield
+                    finally:
+                        self._lock_depth = 0
+
+    def version(self) -> Optional[tuple]:
+        """(mtime_ns, size) of the snapshot and journal, or None if neither exists"""
+        version = []
+        for path in (self.snapshot_path, self.journal_path):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                version.extend((0, -1))
+            else:
+                version.extend((stat.st_mtime_ns, stat.st_size))
+        if version[1] < 0 and version[3] < 0:
+            return None
+        return tuple(version)
+
+    def load(self) -> Dict[str, dict]:
+        """Load the snapshot and replay the journal on top of it"""
+        if self.version() is None:
+            # Nothing written yet; don't create a lock file just to read
+            return {}
+        with self.locked():
+            return self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        data: Dict[str, dict] = {}
+
+        if self.snapshot_path.exists():
+            # The lock keeps compaction from swapping the snapshot and
+            # truncating the journal between the two reads
+            raw = self.snapshot_path.read_bytes()
+            self._snapshot_bytes = len(raw)
+            data = orjson.loads(raw) if raw else {}
+
+        if self.journal_path.exists():
+            with open(self.journal_path, 'rb') as f:
+                raw = f.read()
+            self._journal_bytes = len(raw)
+            for line in raw.splitlines():
+                try:
+                    event = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Partial line from an interrupted write
+                    continue
+                if event.get("op") == "put":
+                    data[event["key"]] = event["value"]
+                elif event.get("op") == "del":
+                    data.pop(event["key"], None)
+
+        return data
+
+    def put(self, key: str, value, sync: bool = False) -> None:
+        """Record that key now maps to value (a dict or an orjson-serializable dataclass)"""
+        self._append({"op": "put", "key": key, "value": value}, sync)
+
+    def put_many(self, items: Dict[str, object], sync: bool = False) -> None:
+        """Record several puts with a single write (and at most one fsync)"""
+        self._write_locked(b"".join(
+            orjson.dumps({"op": "put", "key": key, "value": value}) + b"\n"
+            for key, value in items.items()
+        ), sync)
+
+    def delete(self, key: str) -> None:
+        """Record that key was removed"""
+        self._append({"op": "del", "key": key}, False)
+
+    def _append(self, event: dict, sync: bool) -> None:
+        self._write_locked(orjson.dumps(event) + b"\n", sync)
+
+    def _write_locked(self, data: bytes, sync: bool) -> None:
+        if not data:
+            return
+        with self.locked():
+            self._write(data, sync)
+
+    def _write(self, data: bytes, sync: bool) -> None:
+        if self._journal is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, 'ab', buffering=0)
+        self._journal.write(data)
+        if sync:
+            os.fsync(self._journal.fileno())
+        # Other processes append to (and truncate) the same journal
+        self._journal_bytes = os.fstat(self._journal.fileno()).st_size
+
+    def needs_compaction(self) -> bool:
+        """True when the journal has outgrown the snapshot"""
+        limit = self.compact_ratio * max(self._snapshot_bytes, self.MIN_COMPACT_BYTES)
+        return self._journal_bytes > limit
+
+    def compact(self, data) -> None:
+        """
+        Atomically rewrite the snapshot from data, then truncate the journal
+        With several writers, data must have been loaded under the same locked()
+        """
+        payload = orjson.dumps(data, option=JSON_DUMP_OPTION)
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.locked():
+            # A crash mid-write leaves the old snapshot plus a full journal,
+            # never a torn snapshot
+            atomic_write_bytes(self.snapshot_path, payload)
+            self._snapshot_bytes = len(payload)
+
+            # O_APPEND handle keeps working after truncation
+            with open(self.journal_path, 'wb'):
+                pass
+            self._journal_bytes = 0
+
+    def maybe_compact(self, data) -> None:
+        """Compact only when the journal has outgrown the snapshot"""
+        if self.needs_compaction():
+            self.compact(data)
+
+
+# Number of token shards (each has its own lock and journal file)
+TOKEN_BUCKETS = 16
+
+
+@dataclass
+class TokenBucket:
+    """One shard of the download token store"""
+    lock: threading.Lock
+    tokens: Dict[str, DownloadToken]
+    journal: JsonJournal
+    # Store version the in-memory tokens reflect (other workers share the journal)
+    version: Optional[tuple] = None
+
 
 class ReviewStorage:
     """
@@ -77,131 +321,300 @@ class ReviewStorage:
             base_dir = Path(__file__).parent.parent.parent / "storage" / "reviews"
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
-
-        # Token storage (in-memory with persistence)
-        self._tokens: Dict[str, DownloadToken] = {}
-        self._tokens_file = self.base_dir / "_tokens.json"
+        # Review paths are built as plain strings (os functions accept str),
+        # avoiding Path allocations for every review visited
+        self._base_dir_str = str(self.base_dir)
+
+        # Token storage (in-memory with persistence), sharded into buckets
+        # with their own lock and journal so concurrent token operations on
+        # different buckets don't contend
+        self._token_buckets = [
+            TokenBucket(
+                lock=threading.Lock(),
+                tokens={},
+                journal=JsonJournal(self.base_dir / f"_tokens_{i}.json")
+            )
+            for i in range(TOKEN_BUCKETS)
+        ]
         self._load_tokens()
 
-        # Thread lock for token operations
-        self._token_lock = threading.Lock()
+        # Lightweight review index (status, creator, dates, file mtime)
+        # so list_reviews only parses review.json files that changed
+        self._index: Dict[str, dict] = {}
+        self._index_file = self.base_dir / "_index.json"
+        self._index_lock = threading.Lock()
+        self._load_index()
 
-    def _get_review_dir(self, review_id: str) -> Path:
+    def _get_review_dir(self, review_id: str) -> str:
         """Get directory for a specific review"""
-        return self.base_dir / review_id
+        return f"{self._base_dir_str}{os.sep}{review_id}"
 
-    def _get_review_file(self, review_id: str) -> Path:
+    def _get_review_file(self, review_id: str) -> str:
         """Get review.json path for a specific review"""
-        return self._get_review_dir(review_id) / "review.json"
+        return f"{self._base_dir_str}{os.sep}{review_id}{os.sep}review.json"
 
     def save(self, review: Review) -> None:
         """
-        Save review to storage with file locking
-        Guardar revision en almacenamiento con bloqueo de archivo
+        Save review to storage with an atomic rename
+        Guardar revision en almacenamiento con renombrado atomico
         """
-        review_dir = self._get_review_dir(review.review_id)
-        review_dir.mkdir(parents=True, exist_ok=True)
+        os.makedirs(self._get_review_dir(review.review_id), exist_ok=True)
 
         review_file = self._get_review_file(review.review_id)
 
-        # Use file locking for concurrent access
-        with open(review_file, 'w') as f:
-            with file_lock_exclusive(f):
-                json.dump(review.to_dict(), f, indent=2, ensure_ascii=False)
+        # Write-then-rename: a crash mid-write never leaves a truncated file
+        payload = orjson.dumps(review.to_dict(), option=JSON_DUMP_OPTION)
+        atomic_write_bytes(review_file, payload)
+
+        with self._index_lock:
+            self._index[review.review_id] = self._index_entry(
+                review, os.stat(review_file)
+            )
 
     def load(self, review_id: str) -> Optional[Review]:
         """
         Load review from storage
         Cargar revision desde almacenamiento
         """
-        review_file = self._get_review_file(review_id)
-
-        if not review_file.exists():
+        # save() replaces the file atomically, so no shared lock is needed
+        try:
+            data = load_json_file(self._get_review_file(review_id))
+        except FileNotFoundError:
             return None
-
-        with open(review_file, 'r') as f:
-            with file_lock_shared(f):
-                data = json.load(f)
-                return Review.from_dict(data)
+        return Review.from_dict(data)
 
     def exists(self, review_id: str) -> bool:
         """Check if review exists"""
-        return self._get_review_file(review_id).exists()
+        return os.path.exists(self._get_review_file(review_id))
 
-    def list_reviews(self, status: Optional[str] = None, created_by: Optional[str] = None) -> List[Review]:
+    def list_reviews(self, status: Optional[str] = None, created_by: Optional[str] = None,
+                     metadata_only: bool = False) -> Union[List[Review], List[dict]]:
         """
         List all reviews, optionally filtered by status or creator
         Listar todas las revisiones, opcionalmente filtradas por estado o creador
-        """
-        reviews = []
 
-        for review_dir in self.base_dir.iterdir():
-            if not review_dir.is_dir() or review_dir.name.startswith("_"):
-                continue
-
-            review = self.load(review_dir.name)
-            if review:
-                if status and review.status.value != status:
-                    continue
-                if created_by and review.created_by != created_by:
-                    continue
-                reviews.append(review)
-
-        # Sort by creation date, newest first
-        reviews.sort(key=lambda r: r.created_at, reverse=True)
-        return reviews
+        Filtering and sorting run on the in-memory index; only matching
+        reviews are loaded from disk. With metadata_only=True the index
+        entries are returned instead of full Review objects.
+        """
+        with self._index_lock:
+            self._refresh_index()
+            entries = [
+                {"review_id": review_id, **entry}
+                for review_id, entry in self._index.items()
+                if (not status or entry["status"] == status)
+                and (not created_by or entry["created_by"] == created_by)
+            ]
+
+        # Sort by creation date, newest first (itemgetter avoids a Python-level key call)
+        entries.sort(key=operator.itemgetter("created_at"), reverse=True)
+
+        if metadata_only:
+            return entries
+
+        review_ids = [entry["review_id"] for entry in entries]
+        if PARALLEL_LOAD and len(review_ids) > 1:
+            workers = min(PARALLEL_LOAD_WORKERS, len(review_ids))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                loaded = list(executor.map(self.load, review_ids))
+        else:
+            loaded = [self.load(review_id) for review_id in review_ids]
+
+        return [review for review in loaded if review]
 
     def delete(self, review_id: str) -> bool:
         """Delete a review and its directory"""
         review_dir = self._get_review_dir(review_id)
-        if not review_dir.exists():
+        try:
+            entries = list(os.scandir(review_dir))
+        except FileNotFoundError:
             return False
 
-        import shutil
-        shutil.rmtree(review_dir)
+        # Review directories are flat (review.json); unlink files directly
+        # and only fall back to rmtree if something nested shows up
+        if any(e.is_dir(follow_symlinks=False) for e in entries):
+            shutil.rmtree(review_dir)
+        else:
+            for entry in entries:
+                os.unlink(entry.path)
+            os.rmdir(review_dir)
+
+        with self._index_lock:
+            self._index.pop(review_id, None)
         return True
 
+    # Review index
+    @staticmethod
+    def _index_entry(review: Review, file_stat: os.stat_result) -> dict:
+        """Build the index entry for a review"""
+        return {
+            "status": review.status.value,
+            "created_by": review.created_by,
+            "created_at": review.created_at,
+            "mtime": file_stat.st_mtime_ns,
+            "size": file_stat.st_size
+        }
+
+    def _load_index(self) -> None:
+        """Load the persisted review index (validated later against mtimes)"""
+        if not self._index_file.exists():
+            return
+        try:
+            data = orjson.loads(self._index_file.read_bytes())
+            self._index = {
+                review_id: {**entry, "created_at": datetime.fromisoformat(entry["created_at"])}
+                for review_id, entry in data.items()
+            }
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            self._index = {}
+
+    def _save_index(self) -> None:
+        """Persist the review index (orjson writes created_at as ISO 8601)"""
+        # Atomic replace: a crash or a concurrent _load_index never sees a torn index
+        atomic_write_bytes(self._index_file, orjson.dumps(self._index))
+
+    def _refresh_index(self) -> None:
+        """
+        Sync the index with disk: re-read only reviews whose review.json is
+        new or has a different mtime/size (e.g. written by another process
+        or storage instance) and drop reviews that no longer exist.
+        Caller must hold _index_lock.
+        """
+        changed = False
+        seen = set()
+
+        # scandir entries carry the d_type, so is_dir() needs no extra stat
+        with os.scandir(self._base_dir_str) as entries:
+            review_ids = [
+                e.name for e in entries
+                if e.is_dir() and not e.name.startswith("_")
+            ]
+
+        for review_id in review_ids:
+            try:
+                file_stat = os.stat(self._get_review_file(review_id))
+            except FileNotFoundError:
+                continue
+            seen.add(review_id)
+
+            entry = self._index.get(review_id)
+            if (entry is not None and entry["mtime"] == file_stat.st_mtime_ns
+                    and entry["size"] == file_stat.st_size):
+                continue
+
+            review = self.load(review_id)
+            if review:
+                self._index[review_id] = self._index_entry(review, file_stat)
+                changed = True
+
+        for review_id in [r for r in self._index if r not in seen]:
+            del self._index[review_id]
+            changed = True
+
+        if changed:
+            self._save_index()
+
     # Token management
+    def _get_token_bucket(self, token_str: str) -> "TokenBucket":
+        """Bucket owning a token (stable across processes)"""
+        return self._token_buckets[zlib.crc32(token_str.encode()) % TOKEN_BUCKETS]
+
     def _load_tokens(self) -> None:
-        """Load tokens from persistent storage"""
-        if self._tokens_file.exists():
-            try:
-                with open(self._tokens_file, 'r') as f:
-                    data = json.load(f)
-                    self._tokens = {
-                        k: DownloadToken.from_dict(v)
-                        for k, v in data.items()
-                    }
-            except (json.JSONDecodeError, KeyError):
-                self._tokens = {}
+        """Load every token bucket from persistent storage (snapshot + journal)"""
+        for bucket in self._token_buckets:
+            self._load_token_bucket(bucket)
+
+    @staticmethod
+    def _load_token_bucket(bucket: "TokenBucket") -> None:
+        """(Re)load one bucket, replacing its in-memory tokens"""
+        # Version first: a write landing in between only causes one extra reload
+        bucket.version = bucket.journal.version()
+        try:
+            bucket.tokens = {
+                k: DownloadToken.from_dict(v)
+                for k, v in bucket.journal.load().items()
+            }
+        except (orjson.JSONDecodeError, KeyError):
+            bucket.tokens = {}
+
+    @contextmanager
+    def _token_transaction(self, bucket: "TokenBucket"):
+        """
+        Hold a bucket's thread and store locks over up-to-date tokens
+        With WORKERS > 1 every worker journals the same bucket files, so a
+        token issued by one worker is picked up (and consumed once) by another
+        """
+        with bucket.lock, bucket.journal.locked():
+            if bucket.journal.version() != bucket.version:
+                self._load_token_bucket(bucket)
+            yield
+            bucket.version = bucket.journal.version()
 
     def _save_tokens(self) -> None:
-        """Save tokens to persistent storage"""
-        with open(self._tokens_file, 'w') as f:
-            with file_lock_exclusive(f):
-                json.dump(
-                    {k: v.to_dict() for k, v in self._tokens.items()},
-                    f, indent=2
-                )
+        """
+        Save full token snapshots and truncate the journals
+        orjson serializes the DownloadToken dataclasses directly (datetimes
+        as ISO strings, same format as DownloadToken.to_dict)
+        """
+        for bucket in self._token_buckets:
+            with self._token_transaction(bucket):
+                bucket.journal.compact(bucket.tokens)
+
+    @staticmethod
+    def _journal_token(bucket: "TokenBucket", token: DownloadToken, sync: bool = False) -> None:
+        """
+        Append a token change to its bucket journal, compacting if it grew too large
+        Call inside _token_transaction(), so the compacted tokens are current
+        """
+        bucket.journal.put(token.token, token, sync=sync)
+        bucket.journal.maybe_compact(bucket.tokens)
 
     def create_download_token(self, review_id: str, ttl_seconds: int = 300) -> DownloadToken:
         """
         Create a new download token for a review
         Crear un nuevo token de descarga para una revision
         """
-        with self._token_lock:
-            token = DownloadToken.generate(review_id, ttl_seconds)
-            self._tokens[token.token] = token
-            self._save_tokens()
-            return token
+        token = DownloadToken.generate(review_id, ttl_seconds)
+        bucket = self._get_token_bucket(token.token)
+        with self._token_transaction(bucket):
+            bucket.tokens[token.token] = token
+            self._journal_token(bucket, token, sync=True)
+        return token
+
+    def create_download_tokens(self, review_ids: List[str],
+                               ttl_seconds: int = 300) -> List[DownloadToken]:
+        """
+        Create download tokens for several reviews in one batch
+        Crear tokens de descarga para varias revisiones en un lote
+
+        Tokens are journaled with a single write and fsync per bucket.
+        """
+        tokens = [DownloadToken.generate(review_id, ttl_seconds) for review_id in review_ids]
+
+        by_bucket: Dict[int, List[DownloadToken]] = {}
+        for token in tokens:
+            by_bucket.setdefault(zlib.crc32(token.token.encode()) % TOKEN_BUCKETS, []).append(token)
+
+        for index, bucket_tokens in by_bucket.items():
+            bucket = self._token_buckets[index]
+            with self._token_transaction(bucket):
+                for token in bucket_tokens:
+                    bucket.tokens[token.token] = token
+                bucket.journal.put_many(
+                    {token.token: token for token in bucket_tokens}, sync=True
+                )
+                bucket.journal.maybe_compact(bucket.tokens)
+
+        return tokens
 
     def validate_and_consume_token(self, token_str: str, review_id: str) -> bool:
         """
         Validate a download token and mark it as used if valid
         Returns True if token is valid and was consumed
         """
-        with self._token_lock:
-            token = self._tokens.get(token_str)
+        bucket = self._get_token_bucket(token_str)
+        with self._token_transaction(bucket):
+            token = bucket.tokens.get(token_str)
 
             if not token:
                 return False
@@ -214,23 +627,35 @@ class ReviewStorage:
 
             # Mark as used
             token.mark_used()
-            self._save_tokens()
+            self._journal_token(bucket, token)
             return True
 
     def get_token(self, token_str: str) -> Optional[DownloadToken]:
         """Get token by string (for inspection, doesn't consume)"""
-        return self._tokens.get(token_str)
+        bucket = self._get_token_bucket(token_str)
+        # Lock-free dict read unless another worker changed the bucket
+        if bucket.journal.version() != bucket.version:
+            with self._token_transaction(bucket):
+                pass
+        return bucket.tokens.get(token_str)
 
     def cleanup_expired_tokens(self) -> int:
         """Remove expired tokens, returns count of removed tokens"""
-        with self._token_lock:
-            now = datetime.utcnow()
-            expired = [k for k, v in self._tokens.items()
-                       if v.expires_at < now or v.used]
-            for k in expired:
-                del self._tokens[k]
+        now = datetime.utcnow()
+        removed = 0
+
+        for bucket in self._token_buckets:
+            # Empty shards are skipped without taking their lock
+            if not bucket.tokens:
+                continue
+            with self._token_transaction(bucket):
+                expired = [k for k, v in bucket.tokens.items()
+                           if v.used or v.expires_at < now]
+                for k in expired:
+                    del bucket.tokens[k]
 
-            if expired:
-                self._save_tokens()
+                if expired:
+                    bucket.journal.compact(bucket.tokens)
+                    removed += len(expired)
 
-            return len(expired)
+        return removed
@@ -8,24 +8,57 @@ This module handles:
 3. Supervisor management (list, verify, etc.)
 """
 
-import json
+import base64
+import orjson
 import hashlib
+import hmac
+import heapq
 import secrets
-import string
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import threading
 
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+
+from .storage import JsonJournal
+
 # Path to supervisors configuration
 SUPERVISORS_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "supervisors.json"
 APPROVAL_CODES_PATH = Path(__file__).parent.parent.parent / "storage" / "approval_codes.json"
 
+# Argon2id hasher for "password_argon2" entries (encoded hash includes its salt)
+_password_hasher = PasswordHasher()
 
-@dataclass
+
+def hash_password_argon2(password: str) -> str:
+    """Generate an argon2id hash for the "password_argon2" field of supervisors.json"""
+    return _password_hasher.hash(password)
+
+
+def generate_approval_code() -> str:
+    """
+    Random 8-character approval code in base32 (A-Z, 2-7, so no 0/O or 1/I)
+    Shared by the API and the Streamlit UI, which write the same code store
+    """
+    # 5 random bytes = 40 bits = exactly 8 base32 characters
+    return base64.b32encode(secrets.token_bytes(5)).decode('ascii')
+
+
+def normalize_approval_code(code: str) -> str:
+    """
+    Normalize user-entered approval code (call once at the API boundary)
+    Normalizar codigo de aprobacion introducido por el usuario
+    """
+    return code.strip().upper()
+
+
+@dataclass(frozen=True)
 class Supervisor:
-    """Supervisor data model"""
+    """Supervisor data model (immutable, instances are shared from the cache)"""
     id: str
     name: str
     email: str
@@ -45,18 +78,32 @@ class ApprovalCode:
     expires_at: str
     used: bool = False
     used_at: Optional[str] = None
+    # expires_at parsed once; underscore fields are skipped by orjson
+    _expires_dt: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._expires_dt = datetime.fromisoformat(self.expires_at)
 
     def is_expired(self) -> bool:
         """Check if code has expired"""
-        expires = datetime.fromisoformat(self.expires_at)
-        return datetime.utcnow() > expires
+        return datetime.utcnow() > self._expires_dt
 
     def is_valid(self) -> bool:
         """Check if code is valid (not used and not expired)"""
         return not self.used and not self.is_expired()
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Built directly: asdict() deep-copies recursively and would
+        # include the private _expires_dt field
+        return {
+            "code": self.code,
+            "review_id": self.review_id,
+            "supervisor_id": self.supervisor_id,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
+            "used": self.used,
+            "used_at": self.used_at
+        }
 
 
 class SupervisorAuthService:
@@ -66,16 +113,24 @@ class SupervisorAuthService:
 
     def __init__(self):
         self._config: Optional[dict] = None
+        self._supervisor_by_id: Dict[str, Supervisor] = {}
+        self._active_supervisors: Tuple[Supervisor, ...] = ()
         self._approval_codes: Dict[str, ApprovalCode] = {}
+        # Min-heap of (expires_at, code) so cleanup only visits expired codes
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        # review_id -> codes in creation order, for get_codes_for_review
+        self._codes_by_review: Dict[str, List[str]] = {}
         self._lock = threading.Lock()
+        self._codes_journal = JsonJournal(APPROVAL_CODES_PATH)
+        # Store version the in-memory codes reflect (the UI writes the same store)
+        self._codes_version: Optional[tuple] = None
         self._load_config()
         self._load_approval_codes()
 
     def _load_config(self) -> None:
         """Load supervisors configuration from JSON file"""
         if SUPERVISORS_CONFIG_PATH.exists():
-            with open(SUPERVISORS_CONFIG_PATH, 'r', encoding='utf-8') as f:
-                self._config = json.load(f)
+            self._config = orjson.loads(SUPERVISORS_CONFIG_PATH.read_bytes())
         else:
             # Default configuration
             self._config = {
@@ -102,38 +157,95 @@ class SupervisorAuthService:
             }
             # Save default config
             SUPERVISORS_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-            with open(SUPERVISORS_CONFIG_PATH, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=2, ensure_ascii=False)
+            SUPERVISORS_CONFIG_PATH.write_bytes(orjson.dumps(self._config, option=orjson.OPT_INDENT_2))
+
+        self._build_supervisor_cache()
+
+    def _build_supervisor_cache(self) -> None:
+        """Build Supervisor objects once per config load (active supervisors only)"""
+        self._supervisor_by_id = {
+            sup_id: Supervisor(
+                id=sup_id,
+                name=sup_data.get("name", sup_id),
+                email=sup_data.get("email", ""),
+                active=True
+            )
+            for sup_id, sup_data in self._config.get("supervisors", {}).items()
+            if sup_data.get("active", True)
+        }
+        self._active_supervisors = tuple(self._supervisor_by_id.values())
 
     def _load_approval_codes(self) -> None:
-        """Load approval codes from storage"""
-        if APPROVAL_CODES_PATH.exists():
-            try:
-                with open(APPROVAL_CODES_PATH, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for code, code_data in data.items():
-                        self._approval_codes[code] = ApprovalCode(**code_data)
-            except (json.JSONDecodeError, TypeError):
-                self._approval_codes = {}
-        else:
+        """Load approval codes from storage (snapshot + journal), replacing memory"""
+        # Version first: a write landing in between only causes one extra reload
+        self._codes_version = self._codes_journal.version()
+        try:
+            self._approval_codes = {
+                code: ApprovalCode(**code_data)
+                for code, code_data in self._codes_journal.load().items()
+            }
+        except (orjson.JSONDecodeError, TypeError, ValueError):
             self._approval_codes = {}
 
+        self._expiry_heap = [
+            (ac._expires_dt, code) for code, ac in self._approval_codes.items()
+            if not ac.used
+        ]
+        heapq.heapify(self._expiry_heap)
+
+        self._codes_by_review = {}
+        for code, ac in self._approval_codes.items():
+            self._codes_by_review.setdefault(ac.review_id, []).append(code)
+
+    def _refresh_approval_codes(self) -> None:
+        """Reload codes if another process (e.g. the Streamlit UI) changed the store"""
+        if self._codes_journal.version() != self._codes_version:
+            self._load_approval_codes()
+
+    @contextmanager
+    def _codes_transaction(self):
+        """
+        Hold the thread and store locks over up-to-date codes
+        Every code mutation runs inside one, so memory never overwrites newer data
+        """
+        with self._lock, self._codes_journal.locked():
+            self._refresh_approval_codes()
+            yield
+            self._codes_version = self._codes_journal.version()
+
+    def _sync_approval_codes(self) -> None:
+        """Pick up codes written by other processes before a read"""
+        if self._codes_journal.version() != self._codes_version:
+            with self._codes_transaction():
+                pass
+
     def _save_approval_codes(self) -> None:
-        """Save approval codes to storage"""
-        APPROVAL_CODES_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(APPROVAL_CODES_PATH, 'w', encoding='utf-8') as f:
-            data = {code: ac.to_dict() for code, ac in self._approval_codes.items()}
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """
+        Save full approval code snapshot and truncate the journal
+        orjson serializes the ApprovalCode dataclasses directly
+        Call inside _codes_transaction()
+        """
+        self._codes_journal.compact(self._approval_codes)
+
+    def _journal_approval_code(self, approval_code: ApprovalCode, sync: bool = False) -> None:
+        """
+        Append an approval code change to the journal, compacting if needed
+        Call inside _codes_transaction(), so the compacted codes are current
+        """
+        self._codes_journal.put(approval_code.code, approval_code, sync=sync)
+        self._codes_journal.maybe_compact(self._approval_codes)
 
     def _hash_password(self, password: str) -> str:
         """Generate SHA-256 hash of password"""
         return hashlib.sha256(password.encode()).hexdigest()
 
     def _generate_approval_code(self) -> str:
-        """Generate a unique 8-character approval code"""
-        chars = string.ascii_uppercase + string.digits
+        """Generate a unique 8-character approval code (base32: A-Z, 2-7)"""
         while True:
-            code = ''.join(secrets.choice(chars) for _ in range(8))
+            code = generate_approval_code()
+            # Exact dict check (one hash of a fresh 8-char string); with 2^40
+            # codes a retry is practically never needed, and a Bloom filter
+            # would still hash the string and could only add false retries
             if code not in self._approval_codes:
                 return code
 
@@ -142,33 +254,16 @@ class SupervisorAuthService:
         Get list of active supervisors (without passwords)
         Returns list safe for display in UI
         """
-        supervisors = []
-        for sup_id, sup_data in self._config.get("supervisors", {}).items():
-            if sup_data.get("active", True):
-                supervisors.append(Supervisor(
-                    id=sup_id,
-                    name=sup_data.get("name", sup_id),
-                    email=sup_data.get("email", ""),
-                    active=True
-                ))
-        return supervisors
+        return list(self._active_supervisors)
 
     def get_supervisor(self, supervisor_id: str) -> Optional[Supervisor]:
-        """Get supervisor by ID"""
-        sup_data = self._config.get("supervisors", {}).get(supervisor_id)
-        if sup_data and sup_data.get("active", True):
-            return Supervisor(
-                id=supervisor_id,
-                name=sup_data.get("name", supervisor_id),
-                email=sup_data.get("email", ""),
-                active=True
-            )
-        return None
+        """Get active supervisor by ID"""
+        return self._supervisor_by_id.get(supervisor_id)
 
     def verify_password(self, supervisor_id: str, password: str) -> bool:
         """
         Verify supervisor password
-        Checks both plain password and hash for flexibility
+        Checks argon2 hash, SHA-256 hash and plain password for flexibility
         """
         sup_data = self._config.get("supervisors", {}).get(supervisor_id)
         if not sup_data:
@@ -177,15 +272,22 @@ class SupervisorAuthService:
         if not sup_data.get("active", True):
             return False
 
-        # Check password hash first (more secure)
+        # Check SHA-256 hash first (fast path while migrating to argon2)
         stored_hash = sup_data.get("password_hash")
-        if stored_hash:
-            if self._hash_password(password) == stored_hash:
-                return True
+        if stored_hash and hmac.compare_digest(self._hash_password(password), stored_hash):
+            return True
+
+        # Check argon2 hash (slow by design)
+        stored_argon2 = sup_data.get("password_argon2")
+        if stored_argon2:
+            try:
+                return _password_hasher.verify(stored_argon2, password)
+            except (VerificationError, InvalidHashError):
+                return False
 
         # Fall back to plain password (for development/initial setup)
         stored_password = sup_data.get("password")
-        if stored_password and password == stored_password:
+        if stored_password and hmac.compare_digest(stored_password.encode(), password.encode()):
             return True
 
         return False
@@ -201,7 +303,7 @@ class SupervisorAuthService:
         Returns:
             Tuple of (code_string, ApprovalCode object)
         """
-        with self._lock:
+        with self._codes_transaction():
             # Check supervisor exists
             if not self.get_supervisor(supervisor_id):
                 raise ValueError(f"Unknown supervisor: {supervisor_id}")
@@ -226,7 +328,9 @@ class SupervisorAuthService:
 
             # Store
             self._approval_codes[code] = approval_code
-            self._save_approval_codes()
+            heapq.heappush(self._expiry_heap, (approval_code._expires_dt, code))
+            self._codes_by_review.setdefault(review_id, []).append(code)
+            self._journal_approval_code(approval_code, sync=True)
 
             return code, approval_code
 
@@ -235,13 +339,12 @@ class SupervisorAuthService:
         Validate an approval code
 
         Args:
-            code: The approval code to validate
+            code: The approval code to validate (already normalized)
 
         Returns:
             Tuple of (is_valid, ApprovalCode if valid, error_message)
         """
-        code = code.upper().strip()
-
+        self._sync_approval_codes()
         if code not in self._approval_codes:
             return False, None, "Codigo de aprobacion no encontrado"
 
@@ -260,14 +363,12 @@ class SupervisorAuthService:
         Mark an approval code as used
 
         Args:
-            code: The approval code to mark as used
+            code: The approval code to mark as used (already normalized)
 
         Returns:
             True if successfully marked, False otherwise
         """
-        with self._lock:
-            code = code.upper().strip()
-
+        with self._codes_transaction():
             if code not in self._approval_codes:
                 return False
 
@@ -277,14 +378,13 @@ class SupervisorAuthService:
 
             approval_code.used = True
             approval_code.used_at = datetime.utcnow().isoformat()
-            self._save_approval_codes()
+            self._journal_approval_code(approval_code)
 
             return True
 
     def get_approval_code_info(self, code: str) -> Optional[Dict[str, Any]]:
         """Get information about an approval code (for display)"""
-        code = code.upper().strip()
-
+        self._sync_approval_codes()
         if code not in self._approval_codes:
             return None
 
@@ -306,35 +406,49 @@ class SupervisorAuthService:
     def cleanup_expired_codes(self) -> int:
         """
         Remove expired approval codes from storage
+        Only pops the expired head of the expiry heap, O(k log n) for k expired
 
         Returns:
             Number of codes removed
         """
-        with self._lock:
-            initial_count = len(self._approval_codes)
-            self._approval_codes = {
-                code: ac for code, ac in self._approval_codes.items()
-                if not ac.is_expired() or ac.used  # Keep used codes for audit trail
-            }
-            removed = initial_count - len(self._approval_codes)
+        with self._codes_transaction():
+            now = datetime.utcnow()
+            removed = 0
+            while self._expiry_heap and self._expiry_heap[0][0] < now:
+                _, code = heapq.heappop(self._expiry_heap)
+                ac = self._approval_codes.get(code)
+                # Keep used codes for audit trail
+                if ac is not None and not ac.used:
+                    del self._approval_codes[code]
+                    review_codes = self._codes_by_review[ac.review_id]
+                    review_codes.remove(code)
+                    if not review_codes:
+                        del self._codes_by_review[ac.review_id]
+                    removed += 1
             if removed > 0:
                 self._save_approval_codes()
             return removed
 
     def get_codes_for_review(self, review_id: str) -> List[Dict[str, Any]]:
         """Get all approval codes generated for a specific review"""
+        self._sync_approval_codes()
+        # One clock read for the whole scan instead of one per is_valid() call
+        now = datetime.utcnow()
         codes = []
-        for ac in self._approval_codes.values():
-            if ac.review_id == review_id:
-                supervisor = self.get_supervisor(ac.supervisor_id)
-                codes.append({
-                    "code": ac.code,
-                    "supervisor_name": supervisor.name if supervisor else "Unknown",
-                    "created_at": ac.created_at,
-                    "expires_at": ac.expires_at,
-                    "used": ac.used,
-                    "is_valid": ac.is_valid()
-                })
+        # Copy the list: cleanup may remove codes concurrently
+        for code in tuple(self._codes_by_review.get(review_id, ())):
+            ac = self._approval_codes.get(code)
+            if ac is None:
+                continue
+            supervisor = self.get_supervisor(ac.supervisor_id)
+            codes.append({
+                "code": ac.code,
+                "supervisor_name": supervisor.name if supervisor else "Unknown",
+                "created_at": ac.created_at,
+                "expires_at": ac.expires_at,
+                "used": ac.used,
+                "is_valid": not ac.used and now <= ac._expires_dt
+            })
         return codes
 
 
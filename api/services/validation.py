@@ -9,27 +9,155 @@ CRITICAL: This service is the security core that ensures:
 4. Block custom fields are validated and sanitized (B1 mode)
 """
 
-import json
 import re
+import sys
+import orjson
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Callable
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, date
 
 from .block_parser import BlockSchemaLoader, HtmlSanitizer, CustomFieldType
 
 
-@dataclass
+# Compiled per-field validator: value -> (is_valid, error_message, sanitized_value)
+FieldValidator = Callable[[Any], Tuple[bool, Optional[str], Any]]
+
+@lru_cache(maxsize=32)
+def load_schema_file(path: str) -> dict:
+    """
+    Cached schema file loading, shared by all SchemaValidator instances
+    Carga de schema con cache compartida (do not mutate the result)
+    """
+    # orjson parses the UTF-8 bytes directly (no str decode step)
+    with open(path, 'rb') as f:
+        schema = orjson.loads(f.read())
+
+    # Intern field names so every cache derived from the schema shares
+    # one str object per name
+    if "fields" in schema:
+        schema["fields"] = {
+            sys.intern(field_name): field_spec
+            for field_name, field_spec in schema["fields"].items()
+        }
+    return schema
+
+
+# Raw block custom field input may be at most this many times max_length
+# before sanitization (allows for markup); larger payloads are rejected
+# without being parsed
+BLOCK_CUSTOM_PAYLOAD_FACTOR = 4
+
+# Accepted date formats (same shapes as strptime "%Y-%m-%d" / "%d/%m/%Y")
+_ISO_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+_DMY_DATE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+
+def _is_valid_date_string(value: str) -> bool:
+    """Check YYYY-MM-DD or DD/MM/YYYY without strptime's format parser"""
+    match = _ISO_DATE.fullmatch(value)
+    if match is not None:
+        year, month, day = match.groups()
+    else:
+        match = _DMY_DATE.fullmatch(value)
+        if match is None:
+            return False
+        day, month, year = match.groups()
+    try:
+        date(int(year), int(month), int(day))
+    except ValueError:
+        return False
+    return True
+
+
+# Type check compilers: (field_name, field_spec) -> check(value) returning an
+# error message or None. One dict lookup per field at compile time replaces
+# the type-name if/elif chain.
+ValueCheck = Callable[[Any], Optional[str]]
+
+
+def _compile_string_check(field_name: str, field_spec: dict) -> ValueCheck:
+    error = f"Field '{field_name}' must be a string"
+    return lambda value: None if isinstance(value, str) else error
+
+
+def _compile_boolean_check(field_name: str, field_spec: dict) -> ValueCheck:
+    error = f"Field '{field_name}' must be a boolean"
+    return lambda value: None if isinstance(value, bool) else error
+
+
+def _compile_date_check(field_name: str, field_spec: dict) -> ValueCheck:
+    format_error = f"Field '{field_name}' must be a valid date (YYYY-MM-DD or DD/MM/YYYY)"
+    type_error = f"Field '{field_name}' must be a date"
+
+    def check_date(value: Any) -> Optional[str]:
+        if isinstance(value, str):
+            # Validate date format
+            if not _is_valid_date_string(value):
+                return format_error
+        elif not isinstance(value, (date, datetime)):
+            return type_error
+        return None
+
+    return check_date
+
+
+def _compile_enum_check(field_name: str, field_spec: dict) -> ValueCheck:
+    enum_values = field_spec.get("enum_values", [])
+    error = f"Field '{field_name}' must be one of: {enum_values}"
+    return lambda value: None if value in enum_values else error
+
+
+def _compile_list_check(field_name: str, field_spec: dict) -> ValueCheck:
+    list_error = f"Field '{field_name}' must be a list"
+    required_items = [
+        item_field
+        for item_field, item_spec in field_spec.get("item_schema", {}).items()
+        if item_spec.get("required", False)
+    ]
+
+    def check_list(value: Any) -> Optional[str]:
+        if not isinstance(value, list):
+            return list_error
+        # Validate list items
+        if required_items:
+            for i, item in enumerate(value):
+                if not isinstance(item, dict):
+                    return f"Field '{field_name}' item {i} must be an object"
+                for item_field in required_items:
+                    if item_field not in item:
+                        return f"Field '{field_name}' item {i} missing required field '{item_field}'"
+        return None
+
+    return check_list
+
+
+_TYPE_CHECK_COMPILERS: Dict[str, Callable[[str, dict], ValueCheck]] = {
+    "string": _compile_string_check,
+    "boolean": _compile_boolean_check,
+    "date": _compile_date_check,
+    "enum": _compile_enum_check,
+    "list": _compile_list_check,
+}
+
+
+# __slots__ is declared by hand (dataclass(slots=True) needs Python 3.10)
+@dataclass(frozen=True)
 class ValidationError:
     """Validation error with field info"""
+    __slots__ = ("field", "message", "code")
+
     field: str
     message: str
     code: str  # "not_editable", "required", "type_error", "validation_error"
 
 
-@dataclass
+@dataclass(frozen=True)
 class ValidationResult:
     """Result of validation operation"""
+    __slots__ = ("is_valid", "errors", "filtered_data", "unauthorized_fields")
+
     is_valid: bool
     errors: List[ValidationError]
     filtered_data: Dict[str, Any]  # Only editable fields that passed validation
@@ -52,75 +180,109 @@ class SchemaValidator:
             schemas_dir = Path(__file__).parent.parent.parent / "schemas"
         self.schemas_dir = Path(schemas_dir)
         self._schema_cache: Dict[str, dict] = {}
+        self._compiled_cache: Dict[str, Dict[str, FieldValidator]] = {}
+        self._editable_cache: Dict[str, Tuple[str, ...]] = {}
+        self._editable_set_cache: Dict[str, frozenset] = {}
+        self._block_config_by_custom_field: Dict[str, Dict[str, dict]] = {}
+        self._block_custom_fields_cache: Dict[str, Tuple[str, ...]] = {}
+        self._editable_validators_cache: Dict[str, Dict[str, FieldValidator]] = {}
+        self._ui_cache: Dict[str, dict] = {}
+        self._ui_bytes_cache: Dict[str, bytes] = {}
 
     def load_schema(self, doc_type: str) -> dict:
         """
         Load and cache schema for doc_type
         Cargar y cachear schema para doc_type
         """
-        if doc_type in self._schema_cache:
-            return self._schema_cache[doc_type]
-
-        schema_file = self.schemas_dir / f"{doc_type}.json"
-        if not schema_file.exists():
-            raise FileNotFoundError(f"Schema not found for doc_type: {doc_type}")
+        schema = self._schema_cache.get(doc_type)
+        if schema is not None:
+            return schema
 
-        with open(schema_file, 'r', encoding='utf-8') as f:
-            schema = json.load(f)
+        try:
+            schema = load_schema_file(str(self.schemas_dir / f"{doc_type}.json"))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Schema not found for doc_type: {doc_type}") from None
 
         self._schema_cache[doc_type] = schema
         return schema
 
-    def get_editable_fields(self, doc_type: str) -> List[str]:
+    def preload_all(self) -> List[str]:
         """
-        Get list of editable field names for doc_type
-        Obtener lista de nombres de campos editables para doc_type
+        Load and compile every schema in schemas_dir (startup warm-up)
+        Cargar y compilar todos los schemas (precalentamiento al arrancar)
+        """
+        doc_types = sorted(p.stem for p in self.schemas_dir.glob("*.json"))
+        for doc_type in doc_types:
+            self.get_editable_validators(doc_type)
+        return doc_types
+
+    def get_editable_fields(self, doc_type: str) -> Tuple[str, ...]:
+        """
+        Get editable field names for doc_type (cached, immutable tuple)
+        Obtener nombres de campos editables para doc_type (tupla inmutable en cache)
 
         Includes both regular editable fields AND block custom fields (B1 mode)
         """
+        editable = self._editable_cache.get(doc_type)
+        if editable is not None:
+            return editable
+
         schema = self.load_schema(doc_type)
 
-        # Regular editable fields
-        editable = [
+        # Regular editable fields, then block custom fields (B1 mode)
+        editable = tuple(
             field_name
             for field_name, field_spec in schema.get("fields", {}).items()
             if field_spec.get("editable", False)
-        ]
-
-        # Block custom fields (B1 mode)
-        block_custom_fields = self.get_block_custom_fields(doc_type)
-        editable.extend(block_custom_fields)
+        ) + self.get_block_custom_fields(doc_type)
 
+        self._editable_cache[doc_type] = editable
+        self._editable_set_cache[doc_type] = frozenset(editable)
         return editable
 
-    def get_block_custom_fields(self, doc_type: str) -> List[str]:
+    def get_editable_fields_set(self, doc_type: str) -> frozenset:
         """
-        Get list of block custom field names for doc_type
-        These are auto-generated from block definitions in schema
+        Get editable field names as a frozenset for O(1) whitelist checks
+        Obtener campos editables como frozenset para comprobaciones O(1)
         """
-        schema = self.load_schema(doc_type)
-        blocks = schema.get("blocks", {})
+        editable_set = self._editable_set_cache.get(doc_type)
+        if editable_set is None:
+            self.get_editable_fields(doc_type)
+            editable_set = self._editable_set_cache[doc_type]
+        return editable_set
 
-        return [
-            block_config.get("custom_field", f"{block_key}_custom")
-            for block_key, block_config in blocks.items()
-        ]
+    def get_block_custom_fields(self, doc_type: str) -> Tuple[str, ...]:
+        """
+        Get block custom field names for doc_type (cached, immutable tuple)
+        These are auto-generated from block definitions in schema
+        """
+        custom_fields = self._block_custom_fields_cache.get(doc_type)
+        if custom_fields is None:
+            custom_fields = tuple(self._get_block_config_index(doc_type))
+            self._block_custom_fields_cache[doc_type] = custom_fields
+        return custom_fields
 
     def get_block_config(self, doc_type: str, custom_field: str) -> Optional[dict]:
         """
         Get block configuration for a custom field
         Returns None if not a block custom field
         """
-        schema = self.load_schema(doc_type)
-        blocks = schema.get("blocks", {})
-
-        for block_key, block_config in blocks.items():
-            if block_config.get("custom_field", f"{block_key}_custom") == custom_field:
-                return {
+        return self._get_block_config_index(doc_type).get(custom_field)
+
+    def _get_block_config_index(self, doc_type: str) -> Dict[str, dict]:
+        """Map custom field name -> block config (with block_key), built once per doc_type"""
+        index = self._block_config_by_custom_field.get(doc_type)
+        if index is None:
+            blocks = self.load_schema(doc_type).get("blocks", {})
+            index = {
+                sys.intern(block_config.get("custom_field", f"{block_key}_custom")): {
                     "block_key": block_key,
                     **block_config
                 }
-        return None
+                for block_key, block_config in blocks.items()
+            }
+            self._block_config_by_custom_field[doc_type] = index
+        return index
 
     def get_blocks_config(self, doc_type: str) -> Dict[str, dict]:
         """Get all blocks configuration from schema"""
@@ -149,156 +311,204 @@ class SchemaValidator:
 
         For block custom fields with richtext_limited, sanitizes HTML
         """
-        # Check if this is a block custom field
-        block_config = self.get_block_config(doc_type, field_name)
-        if block_config:
-            return self._validate_block_custom_field(field_name, value, block_config)
-
-        # Regular field validation
-        field_spec = self.get_field_spec(doc_type, field_name)
-        if not field_spec:
+        field_validator = self.get_compiled_validators(doc_type).get(field_name)
+        if field_validator is None:
             return False, f"Unknown field: {field_name}", value
+        return field_validator(value)
 
-        field_type = field_spec.get("type", "string")
-        required = field_spec.get("required", False)
-        validation = field_spec.get("validation", {})
+    def get_compiled_validators(self, doc_type: str) -> Dict[str, FieldValidator]:
+        """
+        Get per-field validator closures for doc_type (compiled once and cached)
+        Obtener validadores compilados por campo para doc_type (cacheados)
+        """
+        compiled = self._compiled_cache.get(doc_type)
+        if compiled is None:
+            compiled = self._compile_schema(doc_type)
+            self._compiled_cache[doc_type] = compiled
+        return compiled
 
-        # Check required
-        if required and (value is None or value == ""):
-            return False, f"Field '{field_name}' is required", value
+    def get_editable_validators(self, doc_type: str) -> Dict[str, FieldValidator]:
+        """
+        Get compiled validators for editable fields only (the update whitelist)
+        Obtener validadores compilados solo de los campos editables
+        """
+        editable_validators = self._editable_validators_cache.get(doc_type)
+        if editable_validators is None:
+            compiled = self.get_compiled_validators(doc_type)
+            editable_validators = {
+                field_name: compiled[field_name]
+                for field_name in self.get_editable_fields(doc_type)
+            }
+            self._editable_validators_cache[doc_type] = editable_validators
+        return editable_validators
+
+    def _compile_schema(self, doc_type: str) -> Dict[str, FieldValidator]:
+        """
+        Compile every field of the schema into a validator closure
+        Block custom fields take precedence over regular fields of the same name
+        """
+        schema = self.load_schema(doc_type)
 
-        # Allow None/empty for non-required fields
-        if value is None or value == "":
-            return True, None, value
+        compiled = {
+            field_name: self._compile_field(field_name, field_spec)
+            for field_name, field_spec in schema.get("fields", {}).items()
+        }
 
-        # Type validation
-        valid, error = self._validate_type(field_name, value, field_type, field_spec)
-        if not valid:
-            return False, error, value
+        # Reuse the custom field -> block config index instead of re-deriving names
+        for custom_field, block_config in self._get_block_config_index(doc_type).items():
+            compiled[custom_field] = self._compile_block_custom_field(custom_field, block_config)
 
-        # Additional validation rules
-        if validation:
-            valid, error = self._validate_rules(field_name, value, validation)
-            if not valid:
-                return False, error, value
+        return compiled
 
-        return True, None, value
+    def _compile_field(self, field_name: str, field_spec: dict) -> FieldValidator:
+        """
+        Build the validator closure for a regular schema field
 
-    def _validate_block_custom_field(self, field_name: str, value: Any,
-                                      block_config: dict) -> Tuple[bool, Optional[str], Any]:
+        Error messages are formatted here, once per field, and returned by
+        reference; failing values don't format anything (only list item
+        errors, which include the item index, are built on demand).
         """
-        Validate and sanitize a block custom field value
+        required_error = f"Field '{field_name}' is required"
+        required = field_spec.get("required", False)
+        check_type = self._compile_type_check(field_name, field_spec)
+        check_rules = self._compile_rules(field_name, field_spec.get("validation", {}))
+
+        def validate(value: Any) -> Tuple[bool, Optional[str], Any]:
+            # Allow None/empty for non-required fields
+            if value is None or value == "":
+                if required:
+                    return False, required_error, value
+                return True, None, value
+
+            if check_type is not None:
+                error = check_type(value)
+                if error is not None:
+                    return False, error, value
+
+            if check_rules is not None:
+                error = check_rules(value)
+                if error is not None:
+                    return False, error, value
+
+            return True, None, value
+
+        return validate
+
+    def _compile_block_custom_field(self, field_name: str, block_config: dict) -> FieldValidator:
+        """
+        Build the validator closure for a block custom field
 
         For richtext_limited: sanitizes HTML, removing disallowed tags
         For text: strips any HTML tags
 
         SECURITY: This ensures XSS prevention for user-submitted content
         """
-        if value is None or value == "":
-            if block_config.get("required", False):
-                return False, f"Field '{field_name}' is required", value
-            return True, None, value
-
-        if not isinstance(value, str):
-            return False, f"Field '{field_name}' must be a string", value
-
-        # Get max_length from config
+        required = block_config.get("required", False)
         max_length = block_config.get("max_length", 2000)
-        custom_type = block_config.get("custom_type", "text")
-
-        # Sanitize based on type
-        if custom_type == "richtext_limited":
+        payload_cap = max_length * BLOCK_CUSTOM_PAYLOAD_FACTOR
+        if block_config.get("custom_type", "text") == "richtext_limited":
             # Sanitize HTML - only allow safe tags
-            sanitized = HtmlSanitizer.sanitize(value)
+            sanitize = HtmlSanitizer.sanitize
         else:
             # Plain text - strip all HTML tags
-            sanitized = HtmlSanitizer.strip_all_tags(value)
+            sanitize = HtmlSanitizer.strip_all_tags
 
-        # Check length after sanitization
-        if len(sanitized) > max_length:
-            return False, f"Field '{field_name}' must be at most {max_length} characters", sanitized
+        required_error = f"Field '{field_name}' is required"
+        type_error = f"Field '{field_name}' must be a string"
+        length_error = f"Field '{field_name}' must be at most {max_length} characters"
+        payload_error = f"Field '{field_name}' payload too large"
 
-        return True, None, sanitized
+        def validate(value: Any) -> Tuple[bool, Optional[str], Any]:
+            if value is None or value == "":
+                if required:
+                    return False, required_error, value
+                return True, None, value
 
-    def _validate_type(self, field_name: str, value: Any, field_type: str, field_spec: dict) -> Tuple[bool, Optional[str]]:
-        """Validate value against expected type"""
-        if field_type == "string":
             if not isinstance(value, str):
-                return False, f"Field '{field_name}' must be a string"
-
-        elif field_type == "boolean":
-            if not isinstance(value, bool):
-                return False, f"Field '{field_name}' must be a boolean"
-
-        elif field_type == "date":
-            if isinstance(value, str):
-                # Validate date format
-                try:
-                    datetime.strptime(value, "%Y-%m-%d")
-                except ValueError:
+                return False, type_error, value
+
+            # Reject oversized input before paying for HTML parsing
+            if len(value) > payload_cap:
+                return False, payload_error, value
+
+            sanitized = sanitize(value)
+
+            # Check length after sanitization
+            if len(sanitized) > max_length:
+                return False, length_error, sanitized
+
+            return True, None, sanitized
+
+        return validate
+
+    @staticmethod
+    def _compile_type_check(field_name: str, field_spec: dict) -> Optional[ValueCheck]:
+        """Build a type check returning an error message, or None if any type is accepted"""
+        compile_check = _TYPE_CHECK_COMPILERS.get(field_spec.get("type", "string"))
+        if compile_check is None:
+            return None
+        return compile_check(field_name, field_spec)
+
+    @staticmethod
+    def _compile_rules(field_name: str, validation: dict) -> Optional[ValueCheck]:
+        """Build the additional validation rules check, or None if there are none"""
+        if not validation:
+            return None
+
+        pattern = validation.get("pattern")
+        # Compiled once here instead of going through re's cache on every call
+        compiled_pattern = re.compile(pattern) if pattern is not None else None
+        min_length = validation.get("min_length")
+        max_length = validation.get("max_length")
+        min_value = validation.get("min")
+        max_value = validation.get("max")
+
+        pattern_error = f"Field '{field_name}' does not match required pattern"
+        min_length_error = f"Field '{field_name}' must be at least {min_length} characters"
+        max_length_error = f"Field '{field_name}' must be at most {max_length} characters"
+        min_error = f"Field '{field_name}' must be at least {min_value}"
+        max_error = f"Field '{field_name}' must be at most {max_value}"
+
+        has_text_rules = (
+            compiled_pattern is not None or min_length is not None or max_length is not None
+        )
+        has_numeric_rules = min_value is not None or max_value is not None
+
+        def check_rules(value: Any) -> Optional[str]:
+            if has_text_rules:
+                # Only text rules need the string form
+                text = value if isinstance(value, str) else str(value)
+
+                # Pattern validation
+                if compiled_pattern is not None and compiled_pattern.match(text) is None:
+                    return pattern_error
+
+                # Length validation
+                if min_length is not None and len(text) < min_length:
+                    return min_length_error
+                if max_length is not None and len(text) > max_length:
+                    return max_length_error
+
+            # Numeric validation (numbers used as-is, strings parsed once,
+            # anything non-numeric skips the bounds)
+            if has_numeric_rules:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    number = value
+                else:
                     try:
-                        datetime.strptime(value, "%d/%m/%Y")
+                        number = float(value if isinstance(value, str) else str(value))
                     except ValueError:
-                        return False, f"Field '{field_name}' must be a valid date (YYYY-MM-DD or DD/MM/YYYY)"
-            elif not isinstance(value, (date, datetime)):
-                return False, f"Field '{field_name}' must be a date"
-
-        elif field_type == "enum":
-            enum_values = field_spec.get("enum_values", [])
-            if value not in enum_values:
-                return False, f"Field '{field_name}' must be one of: {enum_values}"
-
-        elif field_type == "list":
-            if not isinstance(value, list):
-                return False, f"Field '{field_name}' must be a list"
-            # Validate list items
-            item_schema = field_spec.get("item_schema", {})
-            if item_schema:
-                for i, item in enumerate(value):
-                    if not isinstance(item, dict):
-                        return False, f"Field '{field_name}' item {i} must be an object"
-                    for item_field, item_spec in item_schema.items():
-                        if item_spec.get("required", False) and item_field not in item:
-                            return False, f"Field '{field_name}' item {i} missing required field '{item_field}'"
-
-        return True, None
-
-    def _validate_rules(self, field_name: str, value: Any, validation: dict) -> Tuple[bool, Optional[str]]:
-        """Validate value against additional validation rules"""
-        if not isinstance(value, str):
-            value = str(value)
-
-        # Pattern validation
-        if "pattern" in validation:
-            pattern = validation["pattern"]
-            if not re.match(pattern, value):
-                return False, f"Field '{field_name}' does not match required pattern"
-
-        # Length validation
-        if "min_length" in validation:
-            if len(value) < validation["min_length"]:
-                return False, f"Field '{field_name}' must be at least {validation['min_length']} characters"
-
-        if "max_length" in validation:
-            if len(value) > validation["max_length"]:
-                return False, f"Field '{field_name}' must be at most {validation['max_length']} characters"
-
-        # Numeric validation
-        if "min" in validation:
-            try:
-                if float(value) < validation["min"]:
-                    return False, f"Field '{field_name}' must be at least {validation['min']}"
-            except ValueError:
-                pass
-
-        if "max" in validation:
-            try:
-                if float(value) > validation["max"]:
-                    return False, f"Field '{field_name}' must be at most {validation['max']}"
-            except ValueError:
-                pass
-
-        return True, None
+                        number = None
+
+                if number is not None:
+                    if min_value is not None and number < min_value:
+                        return min_error
+                    if max_value is not None and number > max_value:
+                        return max_error
+
+            return None
+
+        return check_rules
 
     def validate_update(self, doc_type: str, update_data: Dict[str, Any]) -> ValidationResult:
         """
@@ -321,20 +531,25 @@ class SchemaValidator:
         filtered_data = {}
         unauthorized_fields = []
 
-        editable_fields = self.get_editable_fields(doc_type)
+        # Everything the loop needs is bound to locals up front; the
+        # editable-only validator map doubles as the whitelist
+        editable_validators = self.get_editable_validators(doc_type)
+        append_unauthorized = unauthorized_fields.append
+        append_error = errors.append
 
         for field_name, value in update_data.items():
             # SECURITY CHECK: Is field editable?
-            if field_name not in editable_fields:
-                unauthorized_fields.append(field_name)
+            field_validator = editable_validators.get(field_name)
+            if field_validator is None:
+                append_unauthorized(field_name)
                 # Don't add to filtered_data - silently reject
                 continue
 
             # Validate the field value (returns sanitized value for block custom fields)
-            is_valid, error_msg, sanitized_value = self.validate_field_value(doc_type, field_name, value)
+            is_valid, error_msg, sanitized_value = field_validator(value)
 
             if not is_valid:
-                errors.append(ValidationError(
+                append_error(ValidationError(
                     field=field_name,
                     message=error_msg or "Validation failed",
                     code="validation_error"
@@ -357,6 +572,9 @@ class SchemaValidator:
         """
         errors = []
         schema = self.load_schema(doc_type)
+        # Every schema field has a compiled validator; look it up directly
+        # instead of going back through validate_field_value per field
+        compiled = self.get_compiled_validators(doc_type)
 
         for field_name, field_spec in schema.get("fields", {}).items():
             value = data.get(field_name)
@@ -372,7 +590,7 @@ class SchemaValidator:
 
             # Validate if value present
             if value is not None and value != "":
-                is_valid, error_msg, _ = self.validate_field_value(doc_type, field_name, value)
+                is_valid, error_msg, _ = compiled[field_name](value)
                 if not is_valid:
                     errors.append(ValidationError(
                         field=field_name,
@@ -389,15 +607,19 @@ class SchemaValidator:
 
     def get_schema_for_ui(self, doc_type: str) -> dict:
         """
-        Get schema formatted for UI consumption
+        Get schema formatted for UI consumption (cached, do not mutate)
         Returns field definitions with editability info and blocks config
         """
+        ui_schema = self._ui_cache.get(doc_type)
+        if ui_schema is not None:
+            return ui_schema
+
         schema = self.load_schema(doc_type)
         fields = schema.get("fields", {})
         sections = schema.get("sections", [])
         blocks = schema.get("blocks", {})
 
-        return {
+        ui_schema = {
             "doc_type": doc_type,
             "fields": fields,
             "sections": sections,
@@ -405,3 +627,28 @@ class SchemaValidator:
             "blocks": blocks,
             "block_custom_fields": self.get_block_custom_fields(doc_type)
         }
+        self._ui_cache[doc_type] = ui_schema
+        return ui_schema
+
+    def get_schema_for_ui_json(self, doc_type: str) -> bytes:
+        """
+        Get the UI schema pre-serialized as JSON bytes (cached)
+        Obtener el schema de UI serializado a JSON (cacheado)
+        """
+        payload = self._ui_bytes_cache.get(doc_type)
+        if payload is None:
+            payload = orjson.dumps(self.get_schema_for_ui(doc_type))
+            self._ui_bytes_cache[doc_type] = payload
+        return payload
+
+
+# Singleton instance
+_validator: Optional[SchemaValidator] = None
+
+
+def get_validator() -> SchemaValidator:
+    """Get singleton instance of SchemaValidator"""
+    global _validator
+    if _validator is None:
+        _validator = SchemaValidator()
+    return _validator
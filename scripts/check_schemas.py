@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+CLI script to pre-compile review schemas
+Script CLI para precompilar los schemas de revision
+
+Compiles every schemas/*.json with SchemaValidator, exactly as the API does
+at startup, so malformed schemas (invalid regex patterns, unknown field
+types) fail in CI instead of on the first request.
+
+Usage:
+    python scripts/check_schemas.py
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# The type-check registry is the single source of known field types
+from api.services.validation import SchemaValidator, _TYPE_CHECK_COMPILERS
+
+
+def check_schema(validator: SchemaValidator, doc_type: str) -> bool:
+    """
+    Compile one schema and report problems
+    Compilar un schema e informar de problemas
+
+    Returns:
+        True if the schema compiled without errors
+    """
+    errors = []
+    warnings = []
+
+    try:
+        compiled = validator.get_compiled_validators(doc_type)
+        editable = validator.get_editable_fields(doc_type)
+    except re.error as e:
+        errors.append(f"Invalid validation pattern: {e}")
+    except Exception as e:
+        errors.append(f"Error compiling schema: {e}")
+    else:
+        fields = validator.load_schema(doc_type).get("fields", {})
+        for name, spec in fields.items():
+            field_type = spec.get("type", "string")
+            if field_type not in _TYPE_CHECK_COMPILERS:
+                warnings.append(f"Field '{name}' has unknown type '{field_type}' (not type-checked)")
+        print(f"  {doc_type}: {len(compiled)} validators, {len(editable)} editable fields")
+
+    for err in errors:
+        print(f"  [X] {doc_type}: {err}")
+    for warn in warnings:
+        print(f"  [!] {doc_type}: {warn}")
+
+    return not errors
+
+
+def main():
+    """Main CLI entry point / Punto de entrada CLI principal"""
+    validator = SchemaValidator()
+    doc_types = sorted(p.stem for p in validator.schemas_dir.glob("*.json"))
+    if not doc_types:
+        print("No schemas found!")
+        return 1
+
+    print("Compiling schemas:")
+    all_valid = True
+    for doc_type in doc_types:
+        if not check_schema(validator, doc_type):
+            all_valid = False
+
+    print("\n[OK] All schemas compiled" if all_valid else "\n[FAIL] Some schemas failed to compile")
+    return 0 if all_valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,11 @@ Environment variables:
     DOWNLOAD_TOKEN_TTL: Token TTL in seconds (default: 300)
     HOST: Server host (default: 0.0.0.0)
     PORT: Server port (default: 8000)
+    RELOAD: Auto-reload on code changes (default: true)
+    WORKERS: Worker processes when RELOAD=false (default: 1). Approval codes
+             and download tokens are journaled under a file lock and each
+             worker reloads them when another one changed them, so a token
+             issued by one worker is accepted (once) by any other
     CORS_ORIGINS: Comma-separated allowed origins (default: *)
 """
 
@@ -21,6 +26,18 @@ import os
 import sys
 from pathlib import Path
 
+try:
+    import uvloop  # noqa: F401
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+try:
+    import httptools  # noqa: F401
+    HAS_HTTPTOOLS = True
+except ImportError:
+    HAS_HTTPTOOLS = False
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -38,6 +55,7 @@ def main():
     host = os.environ.get("HOST", "0.0.0.0")
     port = int(os.environ.get("PORT", "8000"))
     reload = os.environ.get("RELOAD", "true").lower() == "true"
+    workers = int(os.environ.get("WORKERS", "1"))
 
     print(f"""
     ==========================================
@@ -62,11 +80,28 @@ def main():
     ==========================================
     """)
 
+    if reload:
+        # Development: single process with auto-reload (uvloop is not
+        # reliable together with the reloader on every platform)
+        uvicorn.run(
+            "api.app:app",
+            host=host,
+            port=port,
+            reload=True
+        )
+        return
+
+    # Production: uvloop + httptools, optionally multi-process.
+    # Each worker runs the app lifespan, so schemas are preloaded per worker.
+    if not HAS_UVLOOP:
+        print("WARNING: uvloop is not installed; falling back to the default asyncio loop")
     uvicorn.run(
         "api.app:app",
         host=host,
         port=port,
-        reload=reload
+        workers=workers,
+        loop="uvloop" if HAS_UVLOOP else "asyncio",
+        http="httptools" if HAS_HTTPTOOLS else "h11"
     )
 
 
@@ -0,0 +1,59 @@
+"""
+Shared test fixtures
+Fixtures compartidos de tests
+
+Schema-backed services only cache immutable compiled data, so a single
+instance per pytest session is reused by every test module. API tests
+get their own review storage under tmp_path, so the suite can also run
+in parallel with pytest-xdist (pip install pytest-xdist; pytest -n auto).
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.services.validation import SchemaValidator
+from api.services.block_parser import BlockParser
+from api.services.storage import ReviewStorage
+from api.app import app
+
+
+@pytest.fixture(scope="session")
+def validator():
+    """Schema validator instance (schemas parsed once per session)"""
+    return SchemaValidator()
+
+
+@pytest.fixture(scope="session")
+def block_parser():
+    """Block parser instance"""
+    return BlockParser()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def manager_password():
+    """Test manager password, set once per session (per xdist worker)"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("MANAGER_PASSWORD", "test_password")
+        yield "test_password"
+
+
+@pytest.fixture(scope="session")
+def app_client(manager_password):
+    """FastAPI test client (lifespan run once per session)"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client(app_client, tmp_path, monkeypatch):
+    """Shared test client with review storage isolated to this test"""
+    storage = ReviewStorage(base_dir=tmp_path / "api_reviews")
+    monkeypatch.setattr("api.routes.review.storage", storage)
+    monkeypatch.setattr("api.routes.manager.storage", storage)
+    return app_client
@@ -24,14 +24,19 @@ from unittest.mock import MagicMock, patch
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from api.models.review import Review, ReviewStatus
-from api.services.validation import SchemaValidator
 from api.services.block_parser import (
-    BlockParser, BlockDefinition, AppendMode,
+    BlockDefinition, AppendMode,
     CustomFieldType, HtmlSanitizer
 )
 from api.services.storage import ReviewStorage
 
 
+# Large payloads built once at import (scope_base_custom max_length is 2000)
+_LONG_TEXT_2500 = "A" * 2500
+_VALID_TEXT_1000 = "A" * 1000
+_OVERSIZED_MARKUP = "<b>" * 10000
+
+
 @pytest.fixture
 def sample_data():
     """Sample review data with block custom fields"""
@@ -54,18 +59,6 @@ def sample_data():
     }
 
 
-@pytest.fixture
-def validator():
-    """Schema validator instance"""
-    return SchemaValidator()
-
-
-@pytest.fixture
-def block_parser():
-    """Block parser instance"""
-    return BlockParser()
-
-
 @pytest.fixture
 def temp_storage(tmp_path):
     """Temporary storage for tests"""
@@ -140,45 +133,31 @@ class TestBlockCustomFieldValidation:
 class TestBlockAppendModes:
     """Tests for different append modes"""
 
-    def test_newline_append_mode(self, block_parser):
-        """Test 5a: Newline append mode works correctly"""
-        base = "El alcance del trabajo incluye revision de estados financieros."
-        custom = "Nota adicional del empleado."
-
-        result = block_parser.combine_content(base, custom, AppendMode.NEWLINE)
-
-        assert result == f"{base}\n{custom}"
-
-    def test_inline_append_mode(self, block_parser):
-        """Test 5b: Inline append mode works correctly"""
-        base = "El alcance del trabajo incluye revision de estados financieros."
-        custom = "Incluyendo subsidiarias."
-
-        result = block_parser.combine_content(base, custom, AppendMode.INLINE)
-
-        assert result == f"{base} {custom}"
-
-    def test_labelled_append_mode(self, block_parser):
-        """Test 5c: Labelled append mode works correctly"""
-        base = "Las responsabilidades de la direccion son:"
-        custom = "Ver anexo detallado."
-        label = "Nota adicional:"
-
-        result = block_parser.combine_content(base, custom, AppendMode.LABELLED, label)
-
-        assert result == f"{base}\n{label} {custom}"
-
-    def test_empty_custom_no_append(self, block_parser):
-        """Test 6: Empty custom doesn't append anything"""
-        base = "El alcance del trabajo incluye revision."
-
-        result = block_parser.combine_content(base, "", AppendMode.NEWLINE)
-
-        assert result == base
-
-        result = block_parser.combine_content(base, None, AppendMode.INLINE)
-
-        assert result == base
+    @pytest.mark.parametrize("base,custom,mode,label,expected", [
+        # Test 5a: Newline append mode
+        ("El alcance del trabajo incluye revision de estados financieros.",
+         "Nota adicional del empleado.", AppendMode.NEWLINE, "",
+         "El alcance del trabajo incluye revision de estados financieros.\n"
+         "Nota adicional del empleado."),
+        # Test 5b: Inline append mode
+        ("El alcance del trabajo incluye revision de estados financieros.",
+         "Incluyendo subsidiarias.", AppendMode.INLINE, "",
+         "El alcance del trabajo incluye revision de estados financieros. "
+         "Incluyendo subsidiarias."),
+        # Test 5c: Labelled append mode
+        ("Las responsabilidades de la direccion son:",
+         "Ver anexo detallado.", AppendMode.LABELLED, "Nota adicional:",
+         "Las responsabilidades de la direccion son:\n"
+         "Nota adicional: Ver anexo detallado."),
+        # Test 6: Empty custom doesn't append anything
+        ("El alcance del trabajo incluye revision.", "", AppendMode.NEWLINE, "",
+         "El alcance del trabajo incluye revision."),
+        ("El alcance del trabajo incluye revision.", None, AppendMode.INLINE, "",
+         "El alcance del trabajo incluye revision."),
+    ], ids=["newline", "inline", "labelled", "empty", "none"])
+    def test_combine_content(self, block_parser, base, custom, mode, label, expected):
+        """Test 5-6: Append modes combine base and custom content correctly"""
+        assert block_parser.combine_content(base, custom, mode, label) == expected
 
 
 class TestBlockVariableRendering:
@@ -205,6 +184,15 @@ class TestBlockVariableRendering:
 
         assert result == "Cliente: Test Corp, Extra: "
 
+    def test_escape_values_for_html(self, block_parser):
+        """Test 8b: Values are HTML-escaped when rendering for HTML"""
+        inner_template = "Cliente: {{ Nombre_Cliente }}"
+        data = {"Nombre_Cliente": "<b>ACME</b> & Co"}
+
+        result = block_parser.render_block_inner(inner_template, data, escape_values=True)
+
+        assert result == "Cliente: &lt;b&gt;ACME&lt;/b&gt; &amp; Co"
+
 
 class TestHtmlSanitization:
     """Tests for HTML sanitization (richtext_limited)"""
@@ -242,6 +230,13 @@ class TestHtmlSanitization:
         assert "style" not in result
         assert "<p>Text</p>" in result
 
+    def test_stray_angle_brackets_escaped(self):
+        """Test 11a: Text that is not a tag is kept but escaped, plain text is decoded"""
+        html = "<p>a < b &amp; c > d</p><img src=x onerror=alert(1)>"
+
+        assert HtmlSanitizer.sanitize(html) == "<p>a &lt; b &amp; c &gt; d</p>"
+        assert HtmlSanitizer.strip_all_tags(html) == "a < b & c > d"
+
     def test_convert_to_word_format(self):
         """Test 12: HTML converted to Word-compatible text"""
         html = "<p>First paragraph</p><p>Second</p><ul><li>Item 1</li><li>Item 2</li></ul>"
@@ -260,9 +255,7 @@ class TestBlockCustomFieldMaxLength:
     def test_max_length_enforced(self, validator):
         """Test 13: Max length is enforced for custom fields"""
         # scope_base_custom has max_length of 2000
-        long_text = "A" * 2500
-
-        update_data = {"scope_base_custom": long_text}
+        update_data = {"scope_base_custom": _LONG_TEXT_2500}
 
         result = validator.validate_update("carta_manifestacion", update_data)
 
@@ -272,15 +265,22 @@ class TestBlockCustomFieldMaxLength:
 
     def test_within_max_length_accepted(self, validator):
         """Test 14: Content within max length is accepted"""
-        valid_text = "A" * 1000  # Within 2000 limit
-
-        update_data = {"scope_base_custom": valid_text}
+        update_data = {"scope_base_custom": _VALID_TEXT_1000}  # Within 2000 limit
 
         result = validator.validate_update("carta_manifestacion", update_data)
 
         assert result.is_valid is True
         assert "scope_base_custom" in result.filtered_data
 
+    def test_oversized_payload_rejected_before_sanitizing(self, validator):
+        """Test 14a: Payloads far above max_length are rejected without sanitizing"""
+        update_data = {"scope_base_custom": _OVERSIZED_MARKUP}
+
+        result = validator.validate_update("carta_manifestacion", update_data)
+
+        assert result.is_valid is False
+        assert "too large" in result.errors[0].message
+
 
 class TestBlockDefinition:
     """Tests for BlockDefinition creation"""
@@ -324,24 +324,23 @@ class TestValidatorBlockIntegration:
 
     def test_get_block_custom_fields(self, validator):
         """Test 17: get_block_custom_fields returns all custom field names"""
-        custom_fields = validator.get_block_custom_fields("carta_manifestacion")
+        custom_fields = set(validator.get_block_custom_fields("carta_manifestacion"))
 
-        assert "scope_base_custom" in custom_fields
-        assert "responsabilidades_custom" in custom_fields
-        assert "manifestaciones_generales_custom" in custom_fields
-        assert "hechos_posteriores_custom" in custom_fields
+        assert {
+            "scope_base_custom", "responsabilidades_custom",
+            "manifestaciones_generales_custom", "hechos_posteriores_custom"
+        } <= custom_fields
 
     def test_editable_fields_includes_block_custom(self, validator):
         """Test 18: get_editable_fields includes block custom fields"""
-        editable = validator.get_editable_fields("carta_manifestacion")
+        editable = validator.get_editable_fields_set("carta_manifestacion")
 
-        # Regular editable fields
-        assert "Nombre_Cliente" in editable
-        assert "Nombre_Firma" in editable
-
-        # Block custom fields
-        assert "scope_base_custom" in editable
-        assert "responsabilidades_custom" in editable
+        # Regular editable fields + block custom fields
+        assert {
+            "Nombre_Cliente", "Nombre_Firma",
+            "scope_base_custom", "responsabilidades_custom"
+        } <= editable
+        assert editable == set(validator.get_editable_fields("carta_manifestacion"))
 
     def test_get_blocks_config(self, validator):
         """Test 19: get_blocks_config returns all block configurations"""
@@ -357,16 +356,6 @@ class TestValidatorBlockIntegration:
 class TestAPIIntegration:
     """API integration tests for B1 mode"""
 
-    @pytest.fixture
-    def client(self):
-        """FastAPI test client"""
-        import os
-        os.environ["MANAGER_PASSWORD"] = "test_password"
-
-        from fastapi.testclient import TestClient
-        from api.app import app
-        return TestClient(app)
-
     def test_create_review_with_empty_custom(self, client, sample_data):
         """Test 20: Create review with empty custom fields"""
         response = client.post("/reviews", json={
@@ -13,10 +13,8 @@ Run with: pytest tests/test_review_api.py -v
 """
 
 import pytest
-import os
 import sys
 import json
-import time
 from pathlib import Path
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
@@ -25,7 +23,7 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from api.models.review import Review, ReviewStatus, AuditLogEntry, DownloadToken
-from api.services.validation import SchemaValidator, ValidationResult
+from api.services.validation import ValidationResult
 from api.services.storage import ReviewStorage
 
 
@@ -49,12 +47,6 @@ def sample_data():
     }
 
 
-@pytest.fixture
-def validator():
-    """Schema validator instance"""
-    return SchemaValidator()
-
-
 @pytest.fixture
 def temp_storage(tmp_path):
     """Temporary storage for tests"""
@@ -121,18 +113,13 @@ class TestSchemaValidation:
 
     def test_editable_fields_whitelist(self, validator):
         """Test 5: Only editable fields are in whitelist"""
-        editable = validator.get_editable_fields("carta_manifestacion")
+        editable = validator.get_editable_fields_set("carta_manifestacion")
 
         # These should be editable
-        assert "Nombre_Cliente" in editable
-        assert "Nombre_Firma" in editable
-        assert "Cargo_Firma" in editable
-        assert "Fecha_encargo" in editable
+        assert {"Nombre_Cliente", "Nombre_Firma", "Cargo_Firma", "Fecha_encargo"} <= editable
 
         # These should NOT be editable
-        assert "Fecha_de_hoy" not in editable
-        assert "Oficina_Seleccionada" not in editable
-        assert "organo" not in editable
+        assert editable.isdisjoint({"Fecha_de_hoy", "Oficina_Seleccionada", "organo"})
 
     def test_reject_non_editable_fields(self, validator):
         """Test 6: Updates to non-editable fields are rejected"""
@@ -162,6 +149,14 @@ class TestSchemaValidation:
         assert result.is_valid is False
         assert any(e.field == "Nombre_Cliente" for e in result.errors)
 
+    def test_date_formats(self, validator):
+        """Test 7a: Dates accept YYYY-MM-DD and DD/MM/YYYY and reject impossible days"""
+        for value in ("2024-02-29", "2024-1-5", "31/12/2024", "1/2/2024"):
+            assert validator.validate_field_value("carta_manifestacion", "Fecha_encargo", value)[0] is True
+
+        for value in ("2023-02-29", "31/04/2024", "12/31/2024", "2024/01/01", "mañana"):
+            assert validator.validate_field_value("carta_manifestacion", "Fecha_encargo", value)[0] is False
+
 
 class TestDownloadToken:
     """Tests for download token security"""
@@ -174,14 +169,15 @@ class TestDownloadToken:
         assert token.used is False
         assert token.review_id == "review_123"
 
-    def test_token_expires(self):
+    def test_token_expires(self, monkeypatch):
         """Test 9: Token expires after TTL"""
-        token = DownloadToken.generate("review_123", ttl_seconds=1)
+        token = DownloadToken.generate("review_123", ttl_seconds=300)
 
         assert token.is_valid() is True
 
-        # Wait for expiration
-        time.sleep(1.5)
+        # Move the clock past expiration instead of sleeping
+        expired_at = token.expires_at + timedelta(seconds=1)
+        monkeypatch.setattr("api.models.review._now", lambda: expired_at)
 
         assert token.is_valid() is False
 
@@ -230,6 +226,58 @@ class TestStorage:
         # Wrong review_id
         assert temp_storage.validate_and_consume_token(token.token, "review_456") is False
 
+    def test_token_journal_replayed_on_load(self, tmp_path):
+        """Test 13a: Token changes are journaled and replayed by a new instance"""
+        storage = ReviewStorage(base_dir=tmp_path / "reviews")
+        token = storage.create_download_token("review_123", ttl_seconds=300)
+        assert storage.validate_and_consume_token(token.token, "review_123") is True
+
+        reloaded = ReviewStorage(base_dir=tmp_path / "reviews")
+        assert reloaded.get_token(token.token).used is True
+
+        # Compaction folds the journal into the snapshot
+        reloaded._save_tokens()
+        assert all(
+            bucket.journal.journal_path.read_bytes() == b""
+            for bucket in reloaded._token_buckets
+        )
+        assert ReviewStorage(base_dir=tmp_path / "reviews").get_token(token.token).used is True
+
+    def test_list_reviews_filters_by_status(self, temp_storage, sample_data):
+        """Test 13b: list_reviews filters on the index and sorts newest first"""
+        draft = Review.create("carta_manifestacion", sample_data, "employee_1")
+        submitted = Review.create("carta_manifestacion", sample_data, "employee_2")
+        submitted.submit("employee_2")
+        temp_storage.save(draft)
+        temp_storage.save(submitted)
+
+        reviews = temp_storage.list_reviews()
+        assert [r.review_id for r in reviews] == [submitted.review_id, draft.review_id]
+
+        drafts = temp_storage.list_reviews(status="DRAFT")
+        assert [r.review_id for r in drafts] == [draft.review_id]
+
+        metadata = temp_storage.list_reviews(created_by="employee_2", metadata_only=True)
+        assert len(metadata) == 1
+        assert metadata[0]["review_id"] == submitted.review_id
+        assert metadata[0]["status"] == "SUBMITTED"
+
+    def test_list_reviews_sees_other_instance_writes(self, tmp_path, sample_data):
+        """Test 13c: Index picks up reviews saved by another storage instance"""
+        storage_a = ReviewStorage(base_dir=tmp_path / "reviews")
+        storage_b = ReviewStorage(base_dir=tmp_path / "reviews")
+
+        review = Review.create("carta_manifestacion", sample_data, "employee_1")
+        storage_a.save(review)
+        assert [r.review_id for r in storage_b.list_reviews()] == [review.review_id]
+
+        review.submit("employee_1")
+        storage_a.save(review)
+        assert storage_b.list_reviews(status="DRAFT") == []
+
+        storage_a.delete(review.review_id)
+        assert storage_b.list_reviews() == []
+
 
 class TestSecurityRequirements:
     """Critical security requirement tests"""
@@ -276,16 +324,6 @@ class TestSecurityRequirements:
 class TestAPIIntegration:
     """Integration tests for API endpoints"""
 
-    @pytest.fixture
-    def client(self):
-        """FastAPI test client"""
-        # Set test password
-        os.environ["MANAGER_PASSWORD"] = "test_password"
-
-        from fastapi.testclient import TestClient
-        from api.app import app
-        return TestClient(app)
-
     def test_create_and_get_preview(self, client, sample_data):
         """Test 17: Create review and get HTML preview"""
         # Create review
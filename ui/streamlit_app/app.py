@@ -8,15 +8,22 @@ Features:
 """
 
 import streamlit as st
-from datetime import datetime, date
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta, timezone
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+import os
 import sys
+import time
 import json
 import io
-import pandas as pd
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from openpyxl import Workbook, load_workbook
 from docx import Document
-import requests
 import hashlib
+import hmac
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -31,6 +38,8 @@ from ui.streamlit_app.state_store import (
     set_imported_data,
 )
 from ui.streamlit_app.form_renderer import FormRenderer
+from api.services.storage import JsonJournal
+from api.services.supervisor_auth import generate_approval_code
 
 
 # Plugin configuration
@@ -42,43 +51,403 @@ API_BASE_URL = "http://localhost:8000"
 # Supervisors configuration path
 SUPERVISORS_CONFIG_PATH = PROJECT_ROOT / "config" / "supervisors.json"
 
+# Approval code and generated-document index stores
+APPROVAL_CODES_PATH = PROJECT_ROOT / "storage" / "approval_codes.json"
+APPROVAL_CODES_ARCHIVE_PATH = PROJECT_ROOT / "storage" / "approval_codes_archive.jsonl"
+OUTPUT_INDEX_PATH = PROJECT_ROOT / "storage" / "output_index.json"
 
-def load_supervisors():
-    """Load supervisors from configuration file"""
-    if SUPERVISORS_CONFIG_PATH.exists():
-        with open(SUPERVISORS_CONFIG_PATH, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            supervisors = []
-            for sup_id, sup_data in config.get("supervisors", {}).items():
-                if sup_data.get("active", True):
-                    supervisors.append({
-                        "id": sup_id,
-                        "name": sup_data.get("name", sup_id),
-                        "email": sup_data.get("email", "")
-                    })
-            return supervisors
+# Generated documents and the default Word template
+OUTPUT_DIR = PROJECT_ROOT / "output"
+TEMPLATE_PATH = PROJECT_ROOT / "Modelo de plantilla.docx"
+
+# Used codes stay in the live store this long after expiring (audit lookups)
+_USED_CODE_RETENTION_SECONDS = 30 * 24 * 3600
+
+# Characters replaced with '_' in export file names
+_FILENAME_TRANS = str.maketrans({' ': '_', '/': '_'})
+
+# Indentation used in the directors list preview
+_DIRECTOR_INDENT = " " * 34
+
+# Boolean normalization tables (compared against value.upper()).
+# Excel/Word imports also treat 1/0 as booleans; JSON keeps numeric strings.
+# "S\u00cd" is the accented form of SI.
+_TABLE_TRUE = frozenset({"SI", "S\u00cd", "1"})
+_TABLE_FALSE = frozenset({"NO", "0"})
+_JSON_TRUE = frozenset({"SI", "S\u00cd", "TRUE", "YES"})
+_JSON_FALSE = frozenset({"NO", "FALSE"})
+
+
+def _normalize_bool(value: str, truthy: frozenset = _TABLE_TRUE, falsy: frozenset = _TABLE_FALSE):
+    """Map SI/NO style strings to booleans; other values are returned unchanged"""
+    upper = value.upper()
+    if upper in truthy:
+        return True
+    if upper in falsy:
+        return False
+    return value
+
+
+def _as_bool(value) -> bool:
+    """Checkbox state for a stored condition (True, or an 'si'-style string)"""
+    return value is True or (isinstance(value, str) and value.upper() in _TABLE_TRUE)
+
+
+@st.cache_data(ttl=60)
+def _load_supervisors_config(mtime: float) -> dict:
+    """
+    Parse supervisors.json once per file version (mtime is the cache key)
+    Parsear supervisors.json una vez por version del archivo
+    """
+    with open(SUPERVISORS_CONFIG_PATH, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _supervisors_config_mtime():
+    """mtime of supervisors.json (None if missing), the key for cached config data"""
+    try:
+        return SUPERVISORS_CONFIG_PATH.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def _get_supervisors_config():
+    """Cached supervisors config, or None if the file does not exist"""
+    mtime = _supervisors_config_mtime()
+    if mtime is None:
+        return None
+    return _load_supervisors_config(mtime)
+
+
+@st.cache_data(ttl=60)
+def _load_supervisors(mtime) -> list:
+    """
+    Active supervisors per supervisors.json version (mtime is the cache key)
+    Supervisores activos por version de supervisors.json
+    """
+    config = _load_supervisors_config(mtime) if mtime is not None else None
+    if config is not None:
+        supervisors = []
+        for sup_id, sup_data in config.get("supervisors", {}).items():
+            if sup_data.get("active", True):
+                supervisors.append({
+                    "id": sup_id,
+                    "name": sup_data.get("name", sup_id),
+                    "email": sup_data.get("email", "")
+                })
+        return supervisors
     return [
         {"id": "admin", "name": "Administrador", "email": "admin@forvismazars.com"},
         {"id": "maria_jose", "name": "Maria Jose", "email": "maria.jose@forvismazars.com"}
     ]
 
 
+def load_supervisors():
+    """Load supervisors from configuration file (cached across reruns)"""
+    return _load_supervisors(_supervisors_config_mtime())
+
+
+@st.cache_data(ttl=60)
+def _load_supervisor_options(mtime) -> tuple:
+    """
+    Active supervisors and their selectbox labels, per supervisors.json version
+    Supervisores activos y sus etiquetas, por version de supervisors.json
+    """
+    supervisors = _load_supervisors(mtime)
+    return supervisors, {s["id"]: f"{s['name']} ({s['email']})" for s in supervisors}
+
+
+def get_supervisor_options() -> tuple:
+    """(supervisors, {id: "name (email)"}) from the cached config"""
+    return _load_supervisor_options(_supervisors_config_mtime())
+
+
+@st.cache_data(ttl=60)
+def _load_supervisor_names(mtime) -> dict:
+    """{id: name} for active supervisors, per supervisors.json version"""
+    return {s["id"]: s["name"] for s in _load_supervisors(mtime)}
+
+
+def get_supervisor_name(supervisor_id: str) -> str:
+    """Display name of a supervisor (the id itself if unknown)"""
+    return _load_supervisor_names(_supervisors_config_mtime()).get(supervisor_id, supervisor_id)
+
+
+@st.cache_resource
+def _get_password_hasher() -> PasswordHasher:
+    """
+    Argon2id hasher built once per process (this script re-runs every rerun)
+    Hasher Argon2id creado una vez por proceso
+    """
+    return PasswordHasher()
+
+
 def verify_supervisor_password(supervisor_id: str, password: str) -> bool:
     """Verify supervisor password locally"""
-    if SUPERVISORS_CONFIG_PATH.exists():
-        with open(SUPERVISORS_CONFIG_PATH, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            sup_data = config.get("supervisors", {}).get(supervisor_id)
-            if sup_data:
-                # Check hash first
-                stored_hash = sup_data.get("password_hash")
-                if stored_hash:
-                    if hashlib.sha256(password.encode()).hexdigest() == stored_hash:
-                        return True
-                # Check plain password
-                if sup_data.get("password") == password:
-                    return True
-    return False
+    config = _get_supervisors_config()
+    if config is None:
+        return False
+    sup_data = config.get("supervisors", {}).get(supervisor_id)
+    if not sup_data:
+        return False
+
+    # Check hash first (constant-time comparison)
+    stored_hash = sup_data.get("password_hash")
+    if stored_hash and hmac.compare_digest(
+        hashlib.sha256(password.encode()).hexdigest(), stored_hash
+    ):
+        return True
+    # Check argon2 hash (same "password_argon2" field as the API)
+    stored_argon2 = sup_data.get("password_argon2")
+    if stored_argon2:
+        try:
+            return _get_password_hasher().verify(stored_argon2, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    # Check plain password
+    stored_password = sup_data.get("password")
+    return bool(stored_password) and hmac.compare_digest(
+        stored_password.encode(), password.encode()
+    )
+
+
+def _iter_excel_rows(uploaded_file):
+    """
+    Yield (name, value) pairs from the first two columns of the first sheet
+    Generar pares (nombre, valor) de las dos primeras columnas de la primera hoja
+
+    .xlsx files are streamed with openpyxl in read-only mode; legacy .xls
+    files (not supported by openpyxl) still go through pandas.
+    """
+    if getattr(uploaded_file, "name", "").lower().endswith(".xls"):
+        import pandas as pd  # only needed for this legacy format
+
+        df = pd.read_excel(uploaded_file, header=None)
+        if df.shape[1] >= 2:
+            df = df.iloc[:, :2].astype(object)
+            yield from df.where(df.notna(), None).itertuples(index=False, name=None)
+        return
+
+    wb = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(min_col=1, max_col=2, values_only=True)
+    finally:
+        wb.close()
+
+
+def _generate_approval_code() -> str:
+    """
+    New approval code not already in the store (same generator as the API)
+    Nuevo codigo de aprobacion que no existe en el almacen
+    """
+    existing = _get_approval_code_index()
+    while True:
+        code = generate_approval_code()
+        if code not in existing:
+            return code
+
+
+@st.cache_resource
+def _get_codes_journal() -> JsonJournal:
+    """
+    Approval code store: snapshot plus append-only journal (same format as the API)
+    Almacen de codigos: snapshot mas journal de solo anadido (mismo formato que la API)
+    """
+    return JsonJournal(APPROVAL_CODES_PATH)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _read_approval_codes(version: Tuple[int, ...]) -> dict:
+    """
+    Fold the journal over the snapshot once per store version
+    Aplicar el journal sobre el snapshot una vez por version del almacen
+    """
+    return _get_codes_journal().load()
+
+
+def _approval_codes_version() -> Optional[Tuple[int, ...]]:
+    """Cache key for the approval code store"""
+    return _get_codes_journal().version()
+
+
+def _load_approval_codes() -> dict:
+    """Read all approval codes ({} if none have been generated yet)"""
+    version = _approval_codes_version()
+    if version is None:
+        return {}
+    # st.cache_data hands each caller its own copy, so callers may mutate it
+    return _read_approval_codes(version)
+
+
+@st.cache_resource
+def _get_output_index_journal() -> JsonJournal:
+    """
+    review_id -> generated .docx path, so approval does not scan output/
+    review_id -> ruta del .docx generado, para no recorrer output/ al aprobar
+    """
+    return JsonJournal(OUTPUT_INDEX_PATH)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _read_output_index(version: Tuple[int, ...]) -> dict:
+    """Load the output index once per store version"""
+    return _get_output_index_journal().load()
+
+
+def _record_output_document(review_id: str, doc_path: Path) -> None:
+    """Remember where the document for review_id was written"""
+    journal = _get_output_index_journal()
+    with journal.locked():
+        journal.put(review_id, str(doc_path))
+        if journal.needs_compaction():
+            # Other Streamlit processes may have written since our last load
+            journal.compact(journal.load())
+    _read_output_index.clear()
+
+
+def _find_output_document(review_id: str) -> Optional[Path]:
+    """Path of the document generated for review_id, or None"""
+    version = _get_output_index_journal().version()
+    if version is not None:
+        doc_path = _read_output_index(version).get(review_id)
+        if doc_path and Path(doc_path).is_file():
+            return Path(doc_path)
+
+    # Documents generated before the index existed; scandir reports the
+    # entry type without a stat per file and avoids glob's pattern matching
+    prefix = review_id[:8]
+    try:
+        with os.scandir(OUTPUT_DIR) as entries:
+            return next(
+                (Path(entry.path) for entry in entries
+                 if entry.name.endswith(".docx") and prefix in entry.name and entry.is_file()),
+                None
+            )
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _read_document_bytes(path: str, mtime_ns: int) -> bytes:
+    """
+    Read a generated document once per file version, not on every rerun
+    Leer un documento generado una vez por version, no en cada rerun
+
+    The cache is process-wide, so every session serving the same document
+    shares one copy; this is the single reader for generated .docx files.
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@dataclass(frozen=True)
+class _ApprovalCodeEntry:
+    """Pre-parsed approval code fields checked by the supervisor verify path"""
+    expires_ts: float
+    used: bool
+    supervisor_id: str
+    review_id: str
+
+
+def _utc_timestamp(iso_value: str) -> float:
+    """POSIX timestamp of an ISO datetime (naive values are UTC, as written by utcnow())"""
+    value = datetime.fromisoformat(iso_value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _build_approval_code_index(version: Tuple[int, ...]) -> Dict[str, _ApprovalCodeEntry]:
+    """
+    Index approval codes once per file version, with expiry pre-parsed
+    Indexar codigos de aprobacion una vez por version, con expiracion ya parseada
+    """
+    return {
+        code: _ApprovalCodeEntry(
+            expires_ts=_utc_timestamp(info["expires_at"]),
+            used=bool(info.get("used", False)),
+            supervisor_id=info["supervisor_id"],
+            review_id=info["review_id"]
+        )
+        for code, info in _read_approval_codes(version).items()
+    }
+
+
+def _get_approval_code_index() -> Dict[str, _ApprovalCodeEntry]:
+    """Shared read-only code -> entry index (do not mutate)"""
+    version = _approval_codes_version()
+    if version is None:
+        return {}
+    return _build_approval_code_index(version)
+
+
+def _put_approval_code(code: str, info: dict) -> None:
+    """
+    Append one approval code change to the journal instead of rewriting the store
+    The snapshot is only rewritten (compact JSON, live codes only) once the
+    journal outgrows it
+    """
+    journal = _get_codes_journal()
+    # The store lock is shared with the API process, which writes the same files
+    with journal.locked():
+        journal.put(code, info, sync=True)
+        _read_approval_codes.clear()
+        if journal.needs_compaction():
+            _compact_approval_codes(journal)
+            _read_approval_codes.clear()
+
+
+def _compact_approval_codes(journal: JsonJournal) -> None:
+    """
+    Rewrite the snapshot with only live codes, archiving the rest
+    Reescribir el snapshot solo con codigos vivos, archivando el resto
+
+    Expired unused codes, and used codes past the retention window, move to
+    the append-only archive so the store every verify parses stays small.
+
+    Works on the store as loaded under its lock. The API compacts the same
+    store but reloads under that lock first, so it never writes archived
+    codes back from memory.
+    """
+    now = time.time()
+    live = {}
+    archived = []
+    with journal.locked():
+        for code, code_info in journal.load().items():
+            expires_ts = _utc_timestamp(code_info["expires_at"])
+            if expires_ts >= now or (
+                code_info.get("used", False) and expires_ts + _USED_CODE_RETENTION_SECONDS >= now
+            ):
+                live[code] = code_info
+            else:
+                archived.append(code_info)
+
+        if archived:
+            # Archive first: a crash before compact() leaves duplicates, never gaps
+            with open(APPROVAL_CODES_ARCHIVE_PATH, 'ab') as f:
+                f.write(b"".join(orjson.dumps(code_info) + b"\n" for code_info in archived))
+        journal.compact(live)
+
+
+def _claim_approval_code(code: str) -> bool:
+    """
+    Mark a code used unless someone already did (check-and-set under the store lock)
+    Marcar un codigo como usado salvo que otra sesion o la API ya lo haya hecho
+
+    The store lock is a file lock shared with the API process, so the claim
+    is atomic against every writer, not just other Streamlit sessions.
+    """
+    journal = _get_codes_journal()
+    with journal.locked():
+        # Read the store itself, not a cached copy, while holding the lock
+        code_info = journal.load().get(code)
+        if code_info is None or code_info.get("used", False):
+            return False
+        code_info["used"] = True
+        code_info["used_at"] = datetime.utcnow().isoformat()
+        _put_approval_code(code, code_info)
+        return True
 
 
 def process_uploaded_file(uploaded_file, file_type: str) -> dict:
@@ -90,44 +459,26 @@ def process_uploaded_file(uploaded_file, file_type: str) -> dict:
 
     try:
         if file_type == "excel":
-            df = pd.read_excel(uploaded_file, header=None)
-
-            if df.shape[1] >= 2:
-                for index, row in df.iterrows():
-                    if pd.notna(row[0]) and pd.notna(row[1]):
-                        var_name = str(row[0]).strip()
-                        var_value = row[1]
-
-                        if pd.api.types.is_datetime64_any_dtype(type(var_value)) or isinstance(var_value, datetime):
-                            var_value = var_value.strftime("%d/%m/%Y")
-                        else:
-                            var_value = str(var_value).strip()
+            for var_name, var_value in _iter_excel_rows(uploaded_file):
+                if var_name is None or var_value is None:
+                    continue
+                var_name = str(var_name).strip()
 
-                        # Normalize boolean values
-                        if var_value.upper() in ['SI', 'SI'] or var_value == '1':
-                            var_value = True
-                        elif var_value.upper() == 'NO' or var_value == '0':
-                            var_value = False
+                if isinstance(var_value, (datetime, date)):
+                    var_value = var_value.strftime("%d/%m/%Y")
+                else:
+                    var_value = str(var_value).strip()
 
-                        extracted_data[var_name] = var_value
+                extracted_data[var_name] = _normalize_bool(var_value)
 
         elif file_type == "word":
             doc = Document(uploaded_file)
 
             for paragraph in doc.paragraphs:
-                text = paragraph.text.strip()
-                if text and ':' in text:
-                    parts = text.split(':', 1)
-                    if len(parts) == 2:
-                        var_name = parts[0].strip()
-                        var_value = parts[1].strip()
-
-                        if var_value.upper() in ['SI', 'SI'] or var_value == '1':
-                            var_value = True
-                        elif var_value.upper() == 'NO' or var_value == '0':
-                            var_value = False
-
-                        extracted_data[var_name] = var_value
+                # One partition scan per paragraph; only the halves need stripping
+                var_name, sep, var_value = paragraph.text.partition(':')
+                if sep:
+                    extracted_data[var_name.strip()] = _normalize_bool(var_value.strip())
 
     except Exception as e:
         st.error(f"Error al procesar el archivo: {str(e)}")
@@ -142,16 +493,15 @@ def process_json_file(uploaded_file) -> dict:
     Procesar archivo JSON cargado
     """
     try:
-        content = uploaded_file.read().decode('utf-8')
-        data = json.loads(content)
+        # Parse the upload buffer in place: getvalue() hands back the
+        # uploaded bytes without a read() copy or a UTF-8 decode to str, and
+        # does not depend on the stream position left by an earlier rerun
+        data = orjson.loads(uploaded_file.getvalue())
 
         # Normalize boolean values
         for key, value in data.items():
             if isinstance(value, str):
-                if value.upper() in ['SI', 'SI', 'TRUE', 'YES']:
-                    data[key] = True
-                elif value.upper() in ['NO', 'FALSE']:
-                    data[key] = False
+                data[key] = _normalize_bool(value, _JSON_TRUE, _JSON_FALSE)
 
         return data
     except Exception as e:
@@ -179,37 +529,83 @@ def serialize_for_export(data: dict) -> dict:
 def export_to_json(data: dict) -> str:
     """Export data to JSON string"""
     serialized = serialize_for_export(data)
-    return json.dumps(serialized, indent=2, ensure_ascii=False)
+    return orjson.dumps(serialized, option=orjson.OPT_INDENT_2).decode('utf-8')
 
 
 def export_to_excel(data: dict) -> bytes:
     """Export data to Excel bytes"""
-    serialized = serialize_for_export(data)
-
-    # Flatten the data for Excel
-    rows = []
-    for key, value in serialized.items():
-        if isinstance(value, list):
+    # Plain Variable/Valor rows: stream them through a write-only workbook
+    # in a single pass (dates are formatted inline instead of going through
+    # serialize_for_export's intermediate dict)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Metadatos')
+    ws.append(("Variable", "Valor"))
+    for key, value in data.items():
+        if isinstance(value, (date, datetime)):
+            ws.append((key, value.strftime("%d/%m/%Y")))
+        elif isinstance(value, list):
             # For lists like directors, create a JSON string representation
-            rows.append({"Variable": key, "Valor": json.dumps(value, ensure_ascii=False)})
+            ws.append((key, json.dumps(value, ensure_ascii=False)))
         elif isinstance(value, bool):
-            rows.append({"Variable": key, "Valor": "SI" if value else "NO"})
+            ws.append((key, "SI" if value else "NO"))
         else:
-            rows.append({"Variable": key, "Valor": str(value) if value else ""})
-
-    df = pd.DataFrame(rows)
+            ws.append((key, str(value) if value else ""))
 
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Metadatos')
-    output.seek(0)
+    wb.save(output)
 
     return output.getvalue()
 
 
+@st.cache_data(max_entries=16)
+def _export_to_excel_cached(json_data: str) -> bytes:
+    """
+    Excel export keyed by the JSON export (rebuilt only when form data changes)
+    Exportacion Excel cacheada por el JSON exportado (solo se regenera si cambian los datos)
+    """
+    return export_to_excel(orjson.loads(json_data))
+
+
+@st.cache_resource
+def _get_plugin(plugin_id: str):
+    """
+    Plugin pack loaded once and shared by every rerun and session (read-only)
+    Plugin cargado una vez y compartido entre ejecuciones y sesiones
+    """
+    return load_plugin(plugin_id)
+
+
+@st.cache_resource
+def _get_form_renderer(plugin_id: str) -> FormRenderer:
+    """Form renderer for plugin_id (holds only read-only plugin config)"""
+    return FormRenderer(_get_plugin(plugin_id))
+
+
+@st.cache_resource
+def _resolve_template_path(plugin_id: str) -> Path:
+    """
+    Template to generate from: the root template, else the plugin's configured one
+    Plantilla para generar: la de la raiz, si no la configurada en el plugin
+
+    Raises FileNotFoundError when neither exists; exceptions are not cached,
+    so a template added later is found on the next rerun.
+    """
+    if TEMPLATE_PATH.exists():
+        return TEMPLATE_PATH
+    template_path = _get_plugin(plugin_id).get_template_path()
+    if not template_path.exists():
+        raise FileNotFoundError(template_path)
+    return template_path
+
+
 def render_normal_user_interface(plugin, form_renderer, template_path):
     """Render the normal user (employee) interface"""
 
+    # Read the clock once per rerun (date defaults and export file names)
+    now = datetime.now()
+    today = now.date()
+    date_stamp = now.strftime('%Y%m%d')
+
     # Main title / Titulo principal
     st.title("Generador de Cartas de Manifestacion - Forvis Mazars")
     st.markdown("---")
@@ -302,22 +698,22 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
         # Store dates as date objects for validation, formatting happens in context_builder
         fecha_hoy = parse_date_string(var_values.get('Fecha_de_hoy', ''))
         if not fecha_hoy:
-            fecha_hoy = datetime.now().date()
+            fecha_hoy = today
         var_values['Fecha_de_hoy'] = st.date_input("Fecha de Hoy", value=fecha_hoy, key="fecha_hoy")
 
         fecha_encargo = parse_date_string(var_values.get('Fecha_encargo', ''))
         if not fecha_encargo:
-            fecha_encargo = datetime.now().date()
+            fecha_encargo = today
         var_values['Fecha_encargo'] = st.date_input("Fecha del Encargo", value=fecha_encargo, key="fecha_encargo")
 
         fecha_ff = parse_date_string(var_values.get('FF_Ejecicio', ''))
         if not fecha_ff:
-            fecha_ff = datetime.now().date()
+            fecha_ff = today
         var_values['FF_Ejecicio'] = st.date_input("Fecha Fin del Ejercicio", value=fecha_ff, key="ff_ejercicio")
 
         fecha_cierre = parse_date_string(var_values.get('Fecha_cierre', ''))
         if not fecha_cierre:
-            fecha_cierre = datetime.now().date()
+            fecha_cierre = today
         var_values['Fecha_cierre'] = st.date_input("Fecha de Cierre", value=fecha_cierre, key="fecha_cierre")
 
         # General info section / Seccion de informacion general
@@ -365,25 +761,25 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
         cond_values['comision'] = 'si' if st.checkbox(
             "Existe Comision de Auditoria?",
-            value=var_values.get('comision', False) if isinstance(var_values.get('comision'), bool) else var_values.get('comision') == 'si',
+            value=_as_bool(var_values.get('comision')),
             key="comision"
         ) else 'no'
 
         cond_values['junta'] = 'si' if st.checkbox(
             "Incluir Junta de Accionistas?",
-            value=var_values.get('junta', False) if isinstance(var_values.get('junta'), bool) else var_values.get('junta') == 'si',
+            value=_as_bool(var_values.get('junta')),
             key="junta"
         ) else 'no'
 
         cond_values['comite'] = 'si' if st.checkbox(
             "Incluir Comite?",
-            value=var_values.get('comite', False) if isinstance(var_values.get('comite'), bool) else var_values.get('comite') == 'si',
+            value=_as_bool(var_values.get('comite')),
             key="comite"
         ) else 'no'
 
         cond_values['incorreccion'] = 'si' if st.checkbox(
             "Hay incorrecciones no corregidas?",
-            value=var_values.get('incorreccion', False) if isinstance(var_values.get('incorreccion'), bool) else var_values.get('incorreccion') == 'si',
+            value=_as_bool(var_values.get('incorreccion')),
             key="incorreccion"
         ) else 'no'
 
@@ -402,7 +798,7 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
                 )
                 cond_values['limitacion_alcance'] = 'si' if st.checkbox(
                     "Hay limitacion al alcance?",
-                    value=var_values.get('limitacion_alcance', False) if isinstance(var_values.get('limitacion_alcance'), bool) else var_values.get('limitacion_alcance') == 'si',
+                    value=_as_bool(var_values.get('limitacion_alcance')),
                     key="limitacion"
                 ) else 'no'
                 if cond_values['limitacion_alcance'] == 'si':
@@ -414,25 +810,25 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
         cond_values['dudas'] = 'si' if st.checkbox(
             "Existen dudas sobre empresa en funcionamiento?",
-            value=var_values.get('dudas', False) if isinstance(var_values.get('dudas'), bool) else var_values.get('dudas') == 'si',
+            value=_as_bool(var_values.get('dudas')),
             key="dudas"
         ) else 'no'
 
         cond_values['rent'] = 'si' if st.checkbox(
             "Incluir parrafo sobre arrendamientos?",
-            value=var_values.get('rent', False) if isinstance(var_values.get('rent'), bool) else var_values.get('rent') == 'si',
+            value=_as_bool(var_values.get('rent')),
             key="rent"
         ) else 'no'
 
         cond_values['A_coste'] = 'si' if st.checkbox(
             "Hay activos valorados a coste en vez de valor razonable?",
-            value=var_values.get('A_coste', False) if isinstance(var_values.get('A_coste'), bool) else var_values.get('A_coste') == 'si',
+            value=_as_bool(var_values.get('A_coste')),
             key="a_coste"
         ) else 'no'
 
         cond_values['experto'] = 'si' if st.checkbox(
             "Se utilizo un experto independiente?",
-            value=var_values.get('experto', False) if isinstance(var_values.get('experto'), bool) else var_values.get('experto') == 'si',
+            value=_as_bool(var_values.get('experto')),
             key="experto"
         ) else 'no'
 
@@ -452,7 +848,7 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
         cond_values['unidad_decision'] = 'si' if st.checkbox(
             "Bajo la misma unidad de decision?",
-            value=var_values.get('unidad_decision', False) if isinstance(var_values.get('unidad_decision'), bool) else var_values.get('unidad_decision') == 'si',
+            value=_as_bool(var_values.get('unidad_decision')),
             key="unidad_decision"
         ) else 'no'
 
@@ -477,7 +873,7 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
         cond_values['activo_impuesto'] = 'si' if st.checkbox(
             "Hay activos por impuestos diferidos?",
-            value=var_values.get('activo_impuesto', False) if isinstance(var_values.get('activo_impuesto'), bool) else var_values.get('activo_impuesto') == 'si',
+            value=_as_bool(var_values.get('activo_impuesto')),
             key="activo_impuesto"
         ) else 'no'
 
@@ -497,7 +893,7 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
         cond_values['operacion_fiscal'] = 'si' if st.checkbox(
             "Operaciones en paraisos fiscales?",
-            value=var_values.get('operacion_fiscal', False) if isinstance(var_values.get('operacion_fiscal'), bool) else var_values.get('operacion_fiscal') == 'si',
+            value=_as_bool(var_values.get('operacion_fiscal')),
             key="operacion_fiscal"
         ) else 'no'
 
@@ -512,13 +908,13 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
         cond_values['compromiso'] = 'si' if st.checkbox(
             "Compromisos por pensiones?",
-            value=var_values.get('compromiso', False) if isinstance(var_values.get('compromiso'), bool) else var_values.get('compromiso') == 'si',
+            value=_as_bool(var_values.get('compromiso')),
             key="compromiso"
         ) else 'no'
 
         cond_values['gestion'] = 'si' if st.checkbox(
             "Incluir informe de gestion?",
-            value=var_values.get('gestion', False) if isinstance(var_values.get('gestion'), bool) else var_values.get('gestion') == 'si',
+            value=_as_bool(var_values.get('gestion')),
             key="gestion"
         ) else 'no'
 
@@ -538,8 +934,6 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
     # Store directors as list of dicts for validation, formatting happens in context_builder
     directivos_list = []
-    directivos_display = []
-    indent = "                                  "
 
     for i in range(num_directivos):
         col_nombre, col_cargo = st.columns(2)
@@ -549,7 +943,6 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
             cargo = st.text_input(f"Cargo {i+1}", key=f"dir_cargo_{i}")
         if nombre and cargo:
             directivos_list.append({"nombre": nombre, "cargo": cargo})
-            directivos_display.append(f"{indent} D. {nombre} - {cargo}")
 
     var_values['lista_alto_directores'] = directivos_list
 
@@ -569,12 +962,17 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
     )
 
     # Preview directors list
-    if directivos_display:
+    if directivos_list:
         st.markdown("#### Vista previa de la lista de directivos:")
-        st.code("\n".join(directivos_display))
+        st.code("\n".join(
+            f"{_DIRECTOR_INDENT} D. {d['nombre']} - {d['cargo']}" for d in directivos_list
+        ))
 
-    # Update session state
-    st.session_state.form_data = {**var_values, **cond_values}
+    # Update session state in place (var_values started as a copy of
+    # form_data, so this leaves form_data == {**var_values, **cond_values})
+    form_data = st.session_state.form_data
+    form_data.update(var_values)
+    form_data.update(cond_values)
 
     # Automatic review section / Seccion de revision automatica
     st.markdown("---")
@@ -599,36 +997,43 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
     st.subheader("Exportar Metadatos")
     st.info("Exporta los datos del formulario para usarlos posteriormente o compartirlos.")
 
-    # Combine all current data for export
-    all_current_data = {**var_values, **cond_values}
+    # All current data for export (already merged into form_data)
+    all_current_data = form_data
+
+    # One file name stem for both exports; date_stamp is day-granular, so
+    # the names (and the download buttons' identity) are stable across reruns
+    client_name_safe = var_values.get('Nombre_Cliente', 'documento').translate(_FILENAME_TRANS)
+    export_stem = f"metadatos_{client_name_safe}_{date_stamp}"
 
     col_export1, col_export2 = st.columns(2)
 
     with col_export1:
         # Export to JSON
         json_data = export_to_json(all_current_data)
-        client_name_safe = var_values.get('Nombre_Cliente', 'documento').replace(' ', '_').replace('/', '_')
-        json_filename = f"metadatos_{client_name_safe}_{datetime.now().strftime('%Y%m%d')}.json"
+        json_filename = f"{export_stem}.json"
 
         st.download_button(
             label="Exportar a JSON",
             data=json_data,
             file_name=json_filename,
             mime="application/json",
-            help="Descarga los metadatos en formato JSON para importarlos posteriormente"
+            help="Descarga los metadatos en formato JSON para importarlos posteriormente",
+            on_click="ignore"
         )
 
     with col_export2:
-        # Export to Excel
-        excel_data = export_to_excel(all_current_data)
-        excel_filename = f"metadatos_{client_name_safe}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+        # Export to Excel (cached on the JSON export, which already holds
+        # the serialized form state)
+        excel_data = _export_to_excel_cached(json_data)
+        excel_filename = f"{export_stem}.xlsx"
 
         st.download_button(
             label="Exportar a Excel",
             data=excel_data,
             file_name=excel_filename,
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            help="Descarga los metadatos en formato Excel"
+            help="Descarga los metadatos en formato Excel",
+            on_click="ignore"
         )
 
     # Supervisor selection and approval code generation
@@ -637,13 +1042,12 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
     st.info("Seleccione el supervisor responsable y genere un codigo de aprobacion. El supervisor usara este codigo junto con su contrasena para aprobar y descargar el documento.")
 
-    # Load supervisors
-    supervisors = load_supervisors()
+    # Load supervisors and their labels (cached per config version)
+    supervisors, supervisor_options = get_supervisor_options()
 
     col_sup1, col_sup2 = st.columns([2, 1])
 
     with col_sup1:
-        supervisor_options = {s["id"]: f"{s['name']} ({s['email']})" for s in supervisors}
         selected_supervisor = st.selectbox(
             "Seleccionar Supervisor",
             options=list(supervisor_options.keys()),
@@ -671,12 +1075,11 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
                 st.error(f"Por favor completa los siguientes campos obligatorios: {', '.join(missing_fields)}")
             else:
                 with st.spinner("Creando revision..."):
-                    try:
-                        # Combine all data
-                        all_data = {**var_values, **cond_values}
+                    import requests  # only needed once the user submits
 
+                    try:
                         # Serialize dates for API
-                        serialized_data = serialize_for_export(all_data)
+                        serialized_data = serialize_for_export(form_data)
 
                         # Create review via API
                         response = requests.post(
@@ -736,7 +1139,6 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
         st.header("Enviar para Aprobacion")
         st.warning("Una vez enviado, el documento quedara congelado y no podra ser editado.")
 
-        supervisor_options = {s["id"]: f"{s['name']} ({s['email']})" for s in supervisors}
         selected_supervisor = st.selectbox(
             "Seleccionar Supervisor",
             options=list(supervisor_options.keys()),
@@ -746,6 +1148,8 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
 
         if st.button("Enviar para Aprobacion del Supervisor", type="primary"):
             with st.spinner("Enviando para aprobacion..."):
+                import requests  # only needed once the user submits
+
                 try:
                     # Submit review via API
                     submit_response = requests.post(
@@ -757,23 +1161,12 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
                         submit_result = submit_response.json()
 
                         # Generate approval code
-                        import secrets
-                        import string
-                        approval_code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(8))
+                        approval_code = _generate_approval_code()
 
                         # Store approval code info
-                        approval_codes_path = PROJECT_ROOT / "storage" / "approval_codes.json"
-                        approval_codes_path.parent.mkdir(parents=True, exist_ok=True)
-
-                        existing_codes = {}
-                        if approval_codes_path.exists():
-                            with open(approval_codes_path, 'r', encoding='utf-8') as f:
-                                existing_codes = json.load(f)
-
-                        from datetime import timedelta
                         expires_at = datetime.utcnow() + timedelta(hours=72)
 
-                        existing_codes[approval_code] = {
+                        _put_approval_code(approval_code, {
                             "code": approval_code,
                             "review_id": review_id,
                             "supervisor_id": selected_supervisor,
@@ -781,10 +1174,7 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
                             "expires_at": expires_at.isoformat(),
                             "used": False,
                             "used_at": None
-                        }
-
-                        with open(approval_codes_path, 'w', encoding='utf-8') as f:
-                            json.dump(existing_codes, f, indent=2, ensure_ascii=False)
+                        })
 
                         # Now generate the Word document
                         # Fetch the final data from API
@@ -797,23 +1187,20 @@ def render_normal_user_interface(plugin, form_renderer, template_path):
                                 plugin_id=PLUGIN_ID,
                                 form_data=final_data,
                                 list_data={},
-                                output_dir=PROJECT_ROOT / "output",
+                                output_dir=OUTPUT_DIR,
                                 template_path=template_path
                             )
 
                             if result.success:
+                                _record_output_document(review_id, result.output_path)
+
                                 # Display success
                                 st.success("Documento enviado para aprobacion exitosamente!")
 
                                 # Display approval code prominently
                                 st.markdown("### Codigo de Aprobacion")
-                                st.markdown(f"""
-                                <div style="background-color: #d4edda; border: 2px solid #28a745; border-radius: 10px; padding: 20px; text-align: center; margin: 20px 0;">
-                                    <h2 style="color: #155724; margin: 0; font-family: monospace; letter-spacing: 0.3em;">{approval_code}</h2>
-                                    <p style="color: #155724; margin-top: 10px;">Codigo para: <strong>{supervisor_options[selected_supervisor]}</strong></p>
-                                    <p style="color: #666; font-size: 0.9em;">Valido por 72 horas</p>
-                                </div>
-                                """, unsafe_allow_html=True)
+                                st.code(approval_code, language=None)
+                                st.caption(f"Codigo para: {supervisor_options[selected_supervisor]} - Valido por 72 horas")
 
                                 st.info(f"""
                                 **Instrucciones para el supervisor:**
@@ -858,13 +1245,13 @@ def render_supervisor_interface():
     col1, col2 = st.columns(2)
 
     with col1:
-        approval_code = st.text_input(
+        approval_code_input = st.text_input(
             "Codigo de Aprobacion",
             placeholder="XXXXXXXX",
             max_chars=8,
             help="Codigo de 8 caracteres proporcionado por el empleado",
             key="supervisor_approval_code"
-        ).upper()
+        )
 
     with col2:
         password = st.text_input(
@@ -877,83 +1264,64 @@ def render_supervisor_interface():
     st.markdown("---")
 
     if st.button("Verificar y Aprobar", type="primary"):
-        if not approval_code or len(approval_code) != 8:
+        # Normalize once, when the supervisor actually submits
+        approval_code = approval_code_input.strip().upper()
+        if len(approval_code) != 8:
             st.error("Por favor, introduzca un codigo de aprobacion valido (8 caracteres).")
         elif not password:
             st.error("Por favor, introduzca su contrasena.")
         else:
             with st.spinner("Verificando..."):
-                # Load approval codes
-                approval_codes_path = PROJECT_ROOT / "storage" / "approval_codes.json"
+                # Look up the code in the pre-parsed index; unknown, used and
+                # expired codes are rejected before any password work
+                code_index = _get_approval_code_index()
+                code_entry = code_index.get(approval_code)
 
-                if not approval_codes_path.exists():
+                if not code_index:
                     st.error("No se encontraron codigos de aprobacion.")
+                elif code_entry is None:
+                    st.error("Codigo de aprobacion no encontrado.")
+                elif code_entry.used:
+                    st.error("Este codigo ya ha sido utilizado.")
+                elif code_entry.expires_ts < time.time():
+                    st.error("El codigo de aprobacion ha expirado.")
                 else:
-                    with open(approval_codes_path, 'r', encoding='utf-8') as f:
-                        codes = json.load(f)
-
-                    if approval_code not in codes:
-                        st.error("Codigo de aprobacion no encontrado.")
+                    # Verify password
+                    supervisor_id = code_entry.supervisor_id
+                    if not verify_supervisor_password(supervisor_id, password):
+                        st.error("Contrasena incorrecta.")
+                    # The index may predate a concurrent approval; re-check on claim
+                    elif not _claim_approval_code(approval_code):
+                        st.error("Este codigo ya ha sido utilizado.")
                     else:
-                        code_info = codes[approval_code]
-
-                        # Check if used
-                        if code_info.get("used", False):
-                            st.error("Este codigo ya ha sido utilizado.")
-                        # Check expiration
-                        elif datetime.fromisoformat(code_info["expires_at"]) < datetime.utcnow():
-                            st.error("El codigo de aprobacion ha expirado.")
+                        supervisor_name = get_supervisor_name(supervisor_id)
+
+                        st.success(f"Documento aprobado por {supervisor_name}")
+
+                        # Find and serve the document
+                        doc_path = _find_output_document(code_entry.review_id)
+
+                        if doc_path is not None:
+                            st.markdown("### Documento Aprobado")
+                            st.download_button(
+                                label="Descargar Documento Aprobado",
+                                data=_read_document_bytes(str(doc_path), doc_path.stat().st_mtime_ns),
+                                file_name=doc_path.name,
+                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                                type="primary",
+                                # No rerun on click: a rerun would drop this
+                                # button, since it only renders after approval
+                                on_click="ignore"
+                            )
+
+                            st.info(f"""
+                            **Detalles de la aprobacion:**
+                            - Supervisor: {supervisor_name}
+                            - Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}
+                            - Codigo utilizado: {approval_code}
+                            """)
                         else:
-                            # Verify password
-                            supervisor_id = code_info["supervisor_id"]
-                            if not verify_supervisor_password(supervisor_id, password):
-                                st.error("Contrasena incorrecta.")
-                            else:
-                                # Success! Mark code as used
-                                codes[approval_code]["used"] = True
-                                codes[approval_code]["used_at"] = datetime.utcnow().isoformat()
-
-                                with open(approval_codes_path, 'w', encoding='utf-8') as f:
-                                    json.dump(codes, f, indent=2, ensure_ascii=False)
-
-                                # Get supervisor info
-                                supervisors = load_supervisors()
-                                supervisor_name = next(
-                                    (s["name"] for s in supervisors if s["id"] == supervisor_id),
-                                    supervisor_id
-                                )
-
-                                st.success(f"Documento aprobado por {supervisor_name}")
-
-                                # Find and serve the document
-                                review_id = code_info["review_id"]
-                                output_dir = PROJECT_ROOT / "output"
-
-                                # Find document with matching trace ID
-                                matching_files = list(output_dir.glob(f"*{review_id[:8]}*.docx"))
-
-                                if matching_files:
-                                    doc_path = matching_files[0]
-                                    with open(doc_path, 'rb') as f:
-                                        doc_bytes = f.read()
-
-                                    st.markdown("### Documento Aprobado")
-                                    st.download_button(
-                                        label="Descargar Documento Aprobado",
-                                        data=doc_bytes,
-                                        file_name=doc_path.name,
-                                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                        type="primary"
-                                    )
-
-                                    st.info(f"""
-                                    **Detalles de la aprobacion:**
-                                    - Supervisor: {supervisor_name}
-                                    - Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-                                    - Codigo utilizado: {approval_code}
-                                    """)
-                                else:
-                                    st.warning("No se encontro el documento asociado. Por favor, contacte con el administrador.")
+                            st.warning("No se encontro el documento asociado. Por favor, contacte con el administrador.")
 
 
 def main():
@@ -969,23 +1337,20 @@ def main():
     # Initialize session state
     init_session_state(PLUGIN_ID)
 
-    # Load plugin
+    # Load plugin (cached across reruns)
     try:
-        plugin = load_plugin(PLUGIN_ID)
+        plugin = _get_plugin(PLUGIN_ID)
     except Exception as e:
         st.error(f"Error loading plugin: {e}")
         return
 
-    # Create form renderer
-    form_renderer = FormRenderer(plugin)
+    # Create form renderer (cached across reruns)
+    form_renderer = _get_form_renderer(PLUGIN_ID)
 
-    # Get template path
-    template_path = PROJECT_ROOT / "Modelo de plantilla.docx"
-    if not template_path.exists():
-        # Try config path
-        template_path = plugin.get_template_path()
-
-    if not template_path.exists():
+    # Get template path (resolved once per process)
+    try:
+        template_path = _resolve_template_path(PLUGIN_ID)
+    except FileNotFoundError:
         st.error("No se encontro el archivo de plantilla")
         st.info("Por favor, asegurate de que el archivo de plantilla este en la carpeta correcta.")
         return
@@ -264,9 +264,9 @@ def render_date_input(
     Returns:
         Selected date
     """
-    from datetime import datetime
+    from datetime import date
     if value is None:
-        value = datetime.now().date()
+        value = date.today()
     return st.date_input(label, value=value, key=key)
 
 
@@ -5,7 +5,7 @@ Renderizador de formularios dinamico desde definiciones YAML
 
 import streamlit as st
 from typing import Any, Dict, List, Optional, Callable
-from datetime import datetime, date
+from datetime import date
 import sys
 from pathlib import Path
 
@@ -169,9 +169,9 @@ class FormRenderer:
         elif field_type == "date":
             if isinstance(current_value, str):
                 parsed = parse_date_string(current_value)
-                current_value = parsed if parsed else datetime.now().date()
+                current_value = parsed if parsed else date.today()
             elif current_value is None or current_value == "today":
-                current_value = datetime.now().date()
+                current_value = date.today()
 
             selected_date = st.date_input(
                 label,